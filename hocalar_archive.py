@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from hocalar_candles import PRICE_COLUMNS, CandleSet
+from hocalar_store import DEFAULT_STORE_PATH
+
+# === Bellek Eşlemeli Mum Arşivi ===
+# Her alan ayrı bir .npy dosyasıdır (timestamp, open, ..., volume, offsets) ve np.load(mmap_mode='r')
+# ile açılır: açılışta ayrıştırma ya da kopyalama yoktur, sayfalar okundukça diskten gelir.
+# Yazım sürümlü klasörlere yapılır; CURRENT dosyası atomik olarak yeni sürüme çevrilir, böylece
+# açık eşlemeler yazım sırasında bozulmaz.
+ARCHIVE_DIR = os.environ.get("HOCALAR_ARCHIVE_DIR", os.path.join(os.path.dirname(DEFAULT_STORE_PATH), "archive"))
+ARCHIVE_FIELDS = ('timestamp', 'offsets') + PRICE_COLUMNS
+KEEP_VERSIONS = 2
+
+
+def archive_path(exchange_id, timeframe, root=ARCHIVE_DIR):
+    return os.path.join(root, f"{exchange_id}_{timeframe}")
+
+
+# === Arşivi Yaz ===
+def write_archive(candles, path):
+    now = time.time_ns()
+    version = time.strftime("%Y%m%d_%H%M%S", time.localtime(now // 10**9)) + f"_{now % 10**9:09d}"
+    target = os.path.join(path, version)
+    os.makedirs(target)
+    for field in ARCHIVE_FIELDS:
+        np.save(os.path.join(target, f"{field}.npy"), np.ascontiguousarray(getattr(candles, field)))
+    with open(os.path.join(target, "symbols.json"), "w", encoding="utf-8") as f:
+        json.dump(candles.symbols, f)
+    current = os.path.join(path, "CURRENT")
+    with open(current + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(current + ".tmp", current)
+    # Eski sürümler silinir; Linux'ta hâlâ eşlenmiş dosyalar kapanana kadar okunabilir kalır
+    versions = sorted(d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d)))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(path, old), ignore_errors=True)
+    return target
+
+
+# Depodaki mumlardan arşiv oluşturur (hocalar_cli.py tarama sonunda çağırır). merge=True iken (--symbols ile
+# kısmi tarama) mevcut arşivdeki diğer semboller korunur, sadece verilen semboller yenilenir.
+def build_archive(store, exchange_id, symbols, timeframe='1d', root=ARCHIVE_DIR, merge=False):
+    path = archive_path(exchange_id, timeframe, root)
+    candles = CandleSet.from_store(store, exchange_id, symbols, timeframe)
+    existing = open_archive(path) if merge else None
+    if existing is not None:
+        kept = {symbol: existing[symbol] for symbol in existing if symbol not in candles}
+        candles = CandleSet.from_frames({**kept, **dict(candles.items())})
+    write_archive(candles, path)
+    return candles
+
+
+# === Arşivi Aç ===
+# CURRENT değişmedikçe aynı eşlemeler kullanılır; sembol başına çağrı sadece bir stat maliyetindedir.
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def open_archive(path):
+    current = os.path.join(path, "CURRENT")
+    try:
+        mtime = os.path.getmtime(current)
+    except OSError:
+        return None
+    with _archives_lock:
+        cached = _archives.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(current) as f:
+                target = os.path.join(path, f.read().strip())
+            arrays = {field: np.load(os.path.join(target, f"{field}.npy"), mmap_mode='r') for field in ARCHIVE_FIELDS}
+            with open(os.path.join(target, "symbols.json"), encoding="utf-8") as f:
+                symbols = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"{path} arşivi açılamadı: {e}")
+            return None
+        candles = CandleSet(symbols, **arrays)
+        _archives[path] = (mtime, candles)
+        return candles
+
+
+def archived_candles(exchange_id, symbol, timeframe='1d', root=ARCHIVE_DIR):
+    candles = open_archive(archive_path(exchange_id, timeframe, root))
+    return candles[symbol] if candles is not None and symbol in candles else None
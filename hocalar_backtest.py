@@ -0,0 +1,334 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from hocalar_exchange import default_exchange_id
+from hocalar_fetch import run_concurrently
+from hocalar_indicators import (_bin_volume, _column, _profile_grid, _timestamps_ms, _typical_price,
+                                _value_area_window)
+from hocalar_metrics import stage, start_run, timed
+from hocalar_replay import REPLAY_EXCHANGE_ID, install_replay
+from hocalar_resample import DAY_MS
+from hocalar_scan import METRIC_COLUMNS, MIN_CANDLES, ScanParams, fetch_ohlcv_data, fetch_usdt_symbols, select_universe
+from hocalar_screener import RuleSet, Screener, compile_expression, load_rule_sets
+from hocalar_state import AvwapState
+
+# === Ayarlar ===
+FORWARD_HORIZONS = (7, 30, 90)
+VALUE_AREA_PCT = 0.7
+
+
+def forward_column(horizon):
+    return f"İleri Getiri {horizon} (%)"
+
+
+# === ATH Sonrası Kutular ===
+# Bir ATH'den sonrakine kadar olan mumların kapanışları bir kez sıralanır, o güne kadar eklenen hacimler kapanış
+# sırasına göre Fenwick ağacında tutulur. Yeni dipte ızgara değişince pencere baştan kutulanmaz; kutu
+# kenarlarının sıralı kapanışlar içindeki yerleri bulunur ve kutular önek toplamlarının farkı olarak okunur
+# (kutu başına O(log n)). Kutu kuralı _bin_volume ile aynıdır: floor((kapanış - taban) / adım).
+class _SegmentBins:
+    def __init__(self, close, volume):
+        valid = ~(np.isnan(close) | np.isnan(volume))
+        positions = np.flatnonzero(valid)
+        order = np.argsort(close[positions], kind="stable")
+        self.sorted_close = close[positions][order]
+        self.rank = np.full(len(close), -1)
+        self.rank[positions[order]] = np.arange(len(positions))
+        self.volume = volume
+        self.tree = np.zeros(len(positions) + 1)
+        self.added = 0
+
+    # Segmentin ilk end mumu ağaca alınır (son eklemeden bu yana gelenler toplu)
+    def add_until(self, end):
+        ranks = self.rank[self.added:end]
+        valid = ranks >= 0
+        idx, weights = ranks[valid] + 1, self.volume[self.added:end][valid]
+        while len(idx):
+            np.add.at(self.tree, idx, weights)
+            idx = idx + (idx & -idx)
+            keep = idx < len(self.tree)
+            idx, weights = idx[keep], weights[keep]
+        self.added = end
+
+    def _prefix(self, counts):
+        total = np.zeros(len(counts))
+        idx = counts.copy()
+        while idx.any():
+            total += self.tree[idx]
+            idx -= idx & -idx
+        return total
+
+    def bins(self, base, step, n_bins):
+        n = len(self.sorted_close)
+        if n == 0 or n_bins == 0:
+            return np.zeros(n_bins)
+        k = np.arange(n_bins + 1)
+        below = np.searchsorted(self.sorted_close, base + k * step)
+        # Kenar hesabı kayan noktada floor_divide'dan bir iki kapanış sapabilir; o kapanışlar tek tek düzeltilir
+        while True:
+            back = (below > 0) & (np.floor_divide(self.sorted_close[np.maximum(below - 1, 0)] - base, step) >= k)
+            ahead = (below < n) & (np.floor_divide(self.sorted_close[np.minimum(below, n - 1)] - base, step) < k)
+            if not (back.any() or ahead.any()):
+                break
+            below = below - back + ahead
+        return np.diff(self._prefix(below))
+
+
+# === Nokta-Zaman Göstergeleri ===
+# Taramanın (compute_symbol_metrics) her geçmiş mum için, o güne kadarki mumlarla hesaplanmış hali; sütunlar
+# tarama tablosuyla aynıdır, böylece kayıtlı kural setleri doğrudan uygulanır. Tek geçişte:
+# - ATH ve tarihi: kümülatif maksimum (eşitlikte ilk mum, taramadaki gibi)
+# - AVWAP ve σ: çapadan itibaren Σ(tp·v), Σv, Σtp, Σtp² kümülatif toplamları (tp ilk değere göre kaydırılır)
+# - ATH sonrası profil: ProfileState gibi kutular artımlı doldurulur; yeni ATH'de pencere yeniden başlar, yeni
+#   dipte ızgara _SegmentBins ile pencere taranmadan kurulur. POC/VAL/VAH kutular değiştiği günlerde mevcut
+#   kutulardan okunur (ızgara boyutu kadar iş, pencere uzunluğundan bağımsız).
+# t günündeki satır sadece 0..t mumlarını kullanır; geleceğe bakan tek sütunlar İleri Getiri sütunlarıdır.
+@timed("point_in_time_metrics")
+def point_in_time_metrics(df, anchor_date="2020-03-18", row_param=50, tick_size=0.01, horizons=FORWARD_HORIZONS):
+    n = len(df)
+    if n < MIN_CANDLES:
+        return pd.DataFrame(columns=METRIC_COLUMNS + [forward_column(h) for h in horizons])
+    ts = _timestamps_ms(df)
+    close, high, low, volume = (_column(df, col) for col in ('close', 'high', 'low', 'volume'))
+    positions = np.arange(n)
+
+    filled_high = np.where(np.isnan(high), -np.inf, high)
+    ath = np.maximum.accumulate(filled_high)
+    new_ath = np.concatenate(([True], filled_high[1:] > ath[:-1]))
+    ath_idx = np.maximum.accumulate(np.where(new_ath, positions, 0))
+
+    active = ts >= AvwapState.start_for(ts, anchor_date)
+    tp = _typical_price(df)
+    sum_pv = np.cumsum(np.where(active, np.nan_to_num(tp * volume), 0.0))
+    sum_v = np.cumsum(np.where(active, np.nan_to_num(volume), 0.0))
+    rows = np.cumsum(active)
+    counted = active & ~np.isnan(tp)
+    shift = tp[np.argmax(counted)] if counted.any() else 0.0
+    delta = np.where(counted, tp - shift, 0.0)
+    count = np.cumsum(counted)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avwap = np.where((rows > 0) & (sum_v != 0), sum_pv / sum_v, np.nan)
+        mean = np.cumsum(delta) / count
+        offset = avwap - shift
+        spread = np.cumsum(delta * delta) / count - 2 * offset * mean + offset ** 2
+        std = np.where((rows > 1) & (count > 0), np.sqrt(np.maximum(spread, 0.0)), 0.0)
+    avwap_upper = avwap + 4 * std
+
+    poc, val, vah = (np.full(n, np.nan) for _ in range(3))
+    ath_starts = np.flatnonzero(new_ath)
+    segment_ends = np.append(ath_starts[1:], n)
+    bins = centers = segment = None
+    window_start = -1
+    window_low = np.inf
+    for t in range(n):
+        changed = True
+        if ath_idx[t] != window_start:
+            window_start = ath_idx[t]
+            segment = None
+            window_low = low[t]
+            price_step, bin_edges = _profile_grid(ath[t], window_low, tick_size, row_param)
+            n_bins = max(len(bin_edges) - 1, 0)
+            centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+            bins = _bin_volume(close[t:t + 1], None, None, volume[t:t + 1], bin_edges[0], price_step, n_bins, 0,
+                               n_bins)
+        elif low[t] < window_low:
+            window_low = low[t]
+            price_step, bin_edges = _profile_grid(ath[t], window_low, tick_size, row_param)
+            n_bins = max(len(bin_edges) - 1, 0)
+            centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+            if segment is None:
+                window_end = segment_ends[np.searchsorted(ath_starts, window_start)]
+                segment = _SegmentBins(close[window_start:window_end], volume[window_start:window_end])
+            segment.add_until(t + 1 - window_start)
+            bins = segment.bins(bin_edges[0], price_step, n_bins)
+        else:
+            k = np.floor_divide(close[t] - bin_edges[0], price_step)
+            changed = 0 <= k < len(bins) and not np.isnan(volume[t])
+            if changed:
+                bins[int(k)] += volume[t]
+        if t + 1 < MIN_CANDLES or not len(bins):
+            continue
+        if not changed and t + 1 > MIN_CANDLES:
+            poc[t], val[t], vah[t] = poc[t - 1], val[t - 1], vah[t - 1]
+            continue
+        poc[t] = centers[np.argmax(bins)]
+        keep = bins > 0
+        if keep.any():
+            volumes = bins[keep]
+            val[t], vah[t] = _value_area_window(centers[keep], volumes, volumes.sum() * VALUE_AREA_PCT)
+
+    ath_ts = ts[ath_idx]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frame = pd.DataFrame({
+            "ATH": ath, "ATH Tarihi": pd.to_datetime(ath_ts, unit="ms"), "Son Fiyat": close,
+            "Son Tarih": pd.to_datetime(ts, unit="ms"), "ATH'den % Fark": (ath - close) / ath * 100,
+            "Gün Sayısı": (ts - ath_ts) // DAY_MS, "AVWAP": avwap, "AVWAP +4σ": avwap_upper,
+            "% Fark AVWAP": (close - avwap) / avwap * 100, "% Fark +4σ": (close - avwap_upper) / avwap_upper * 100,
+            "POC": poc, "VAL": val, "VAH": vah, "% Fark POC": (close - poc) / poc * 100,
+            "% Fark VAL": (close - val) / val * 100, "VP Genişliği (%)": (vah - val) / (ath - val) * 100,
+        })
+        for horizon in horizons:
+            forward = np.full(n, np.nan)
+            forward[:-horizon] = (close[horizon:] / close[:-horizon] - 1) * 100
+            frame[forward_column(horizon)] = forward
+    return frame.iloc[MIN_CANDLES - 1:].reset_index(drop=True)
+
+
+# frames: {sembol: DataFrame}; tüm semboller tek tabloda, Symbol sütunuyla
+def build_backtest_panel(frames, anchor_date="2020-03-18", row_param=50, horizons=FORWARD_HORIZONS):
+    panels = []
+    for symbol, df in frames.items():
+        with stage("backtest_metrics", symbol):
+            frame = point_in_time_metrics(df, anchor_date, row_param, horizons=horizons)
+        if not frame.empty:
+            frame.insert(0, "Symbol", symbol)
+            panels.append(frame)
+    if not panels:
+        return pd.DataFrame(columns=["Symbol"] + METRIC_COLUMNS + [forward_column(h) for h in horizons])
+    return pd.concat(panels, ignore_index=True)
+
+
+# === Kural Setinin Geçmiş Performansı ===
+# Piyasa verileri (Market Cap vb.) geçmiş tarihler için bilinmediğinden bu sütunlara bakan kurallar
+# atlanır ve skipped listesinde döner; bugünkü değerleri geçmişe uygulamak ileriye bakma olurdu. Skor ifadesi
+# de öyleyse skorsuz devam edilir (tablo sırası, limit uygulanmaz).
+# cooldown > 0 ise aynı sembolde bir sinyalden sonraki cooldown mum içindeki sinyaller sayılmaz.
+# Kural setinde skor ve limit varsa her tarihte skora göre en iyi limit sembol alınır.
+def backtest_screen(panel, rule_set, horizons=FORWARD_HORIZONS, cooldown=0):
+    screener = Screener(panel)
+    rules, skipped = [], []
+    for rule in rule_set.rules:
+        try:
+            compile_expression(rule, screener.schema)
+            rules.append(rule)
+        except ValueError as e:
+            skipped.append(str(e))
+    score = rule_set.score
+    if score:
+        try:
+            compile_expression(score, screener.schema)
+        except ValueError as e:
+            skipped.append(f"Skor: {e}")
+            score = ""
+    mask = screener.mask(rules)
+    if cooldown:
+        symbols = panel["Symbol"].to_numpy()
+        last_taken = {}
+        for position in np.flatnonzero(mask):
+            previous = last_taken.get(symbols[position])
+            if previous is not None and position - previous <= cooldown:
+                mask[position] = False
+            else:
+                last_taken[symbols[position]] = position
+    signals = panel.iloc[np.flatnonzero(mask)]
+    if score and not signals.empty:
+        signals = signals.assign(Skor=screener.score(score)[mask])
+        signals = signals.sort_values(["Son Tarih", "Skor"], ascending=[True, rule_set.ascending], kind="stable")
+        if rule_set.limit:
+            signals = signals[signals.groupby("Son Tarih").cumcount() < rule_set.limit]
+
+    summary = []
+    for horizon in horizons:
+        returns = signals[forward_column(horizon)].dropna()
+        baseline = panel[forward_column(horizon)].dropna()
+        summary.append({
+            "Ufuk": horizon, "Sinyal": len(returns),
+            "Ortalama %": returns.mean() if len(returns) else np.nan,
+            "Medyan %": returns.median() if len(returns) else np.nan,
+            "Pozitif %": (returns > 0).mean() * 100 if len(returns) else np.nan,
+            "Tümü Ortalama %": baseline.mean() if len(baseline) else np.nan,
+        })
+    summary = pd.DataFrame(summary)
+    summary["Fark %"] = summary["Ortalama %"] - summary["Tümü Ortalama %"]
+    return signals, summary.round(2), skipped
+
+
+# === Mumları Yükle ve Çalıştır ===
+# Semboller ve mumlar taramayla aynı yoldan gelir (depo + arşiv); offline ise ağa çıkılmaz
+def load_backtest_frames(params):
+    with stage("symbols"):
+        universe = select_universe(fetch_usdt_symbols(params.exchange_id, params.quote), params)
+
+    def load(item):
+        with stage("fetch", item[0]):
+            return item[0], fetch_ohlcv_data(item[0], params.exchange_id, params.timeframe, offline=params.offline)
+
+    return {symbol: df for symbol, df in run_concurrently(universe, load, max_workers=params.max_workers)
+            if len(df) >= MIN_CANDLES}
+
+
+def run_backtest(params, rule_set, horizons=FORWARD_HORIZONS, cooldown=0):
+    frames = load_backtest_frames(params)
+    panel = build_backtest_panel(frames, params.anchor_date, params.row_param, horizons)
+    with stage("backtest_screen"):
+        return backtest_screen(panel, rule_set, horizons, cooldown)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kayıtlı tarama kurallarının geçmiş ileri getirilerini hesaplar")
+    parser.add_argument("--screen", default=None, help="Kayıtlı kural seti adı (hocalar_screener)")
+    parser.add_argument("--rules", default="", help="Noktalı virgülle ayrılmış kurallar (--screen yerine)")
+    parser.add_argument("--score", default="", help="Sıralama skoru ifadesi")
+    parser.add_argument("--limit", type=int, default=0, help="Her tarihte skora göre en iyi kaç sembol")
+    parser.add_argument("--horizons", default=",".join(map(str, FORWARD_HORIZONS)), help="Mum sayısı olarak ufuklar")
+    parser.add_argument("--cooldown", type=int, default=0, help="Aynı sembolde sinyaller arası en az mum sayısı")
+    parser.add_argument("--exchange", default=None)
+    parser.add_argument("--quote", default="USDT")
+    parser.add_argument("--timeframe", default="1d")
+    parser.add_argument("--symbols", default="")
+    parser.add_argument("--max-symbols", type=int, default=0)
+    parser.add_argument("--anchor-date", default="2020-03-18")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--offline", action="store_true", help="Sadece yerel mum deposunu kullan")
+    parser.add_argument("--replay", default=None, metavar="KAYNAK", help="Ağsız oynatma (hocalar_replay)")
+    parser.add_argument("--out", default=None, help="Sinyalleri bu CSV dosyasına yaz")
+    args = parser.parse_args(argv)
+    try:
+        args.horizons = tuple(int(h) for h in args.horizons.split(",") if h.strip())
+    except ValueError:
+        parser.error(f"--horizons tam sayı listesi olmalı: {args.horizons}")
+    if not args.horizons or min(args.horizons) <= 0:
+        parser.error("--horizons pozitif mum sayılarından oluşmalı")
+    # --screen kural setleri kendi skor ve limitini taşır
+    if args.limit and not args.score and not args.screen:
+        parser.error("--limit skora göre seçer, --score ile birlikte verilmeli")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.screen:
+        rule_sets = load_rule_sets()
+        if args.screen not in rule_sets:
+            print(f"Kural seti bulunamadı: {args.screen} (kayıtlı: {', '.join(rule_sets)})", file=sys.stderr)
+            return 1
+        rule_set = rule_sets[args.screen]
+    else:
+        rule_set = RuleSet("komut satırı", tuple(r.strip() for r in args.rules.split(";") if r.strip()),
+                           args.score, limit=args.limit)
+    if args.replay:
+        install_replay(args.replay)
+    params = ScanParams(exchange_id=REPLAY_EXCHANGE_ID if args.replay else args.exchange or default_exchange_id(),
+                        quote=args.quote, timeframe=args.timeframe,
+                        symbols=tuple(s.strip() for s in args.symbols.split(",") if s.strip()),
+                        max_symbols=args.max_symbols, anchor_date=args.anchor_date, row_param=args.rows,
+                        offline=args.offline, max_workers=args.workers)
+    metrics = start_run(f"backtest_{rule_set.name}")
+    signals, summary, skipped = run_backtest(params, rule_set, args.horizons, args.cooldown)
+    metrics.finish()
+    for rule in skipped:
+        print(f"Atlanan ifade (geçmişte hesaplanamaz): {rule}")
+    print(f"{rule_set.name}: {len(signals)} sinyal, {metrics.snapshot()['wall_seconds']:.1f} s")
+    print(summary.to_string(index=False))
+    if args.out:
+        signals.to_csv(args.out, index=False)
+        print(f"Sinyaller: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
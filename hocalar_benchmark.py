@@ -0,0 +1,345 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from hocalar_candles import CandleSet
+from hocalar_indicators import (calculate_avwap, calculate_avwaps, calculate_value_area_range, compute_volume_profile,
+                                compute_volume_profiles)
+from hocalar_panel import compute_panel_metrics
+from hocalar_state import update_indicator_state
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_golden.json")
+
+
+# === Sentetik OHLCV Üret ===
+# Aynı seed her zaman aynı mumları üretir (ağ gerekmez). volatility: günlük log getiri std'si.
+def make_synthetic_ohlcv(days=2500, seed=0, start="2019-01-01", volatility=0.04):
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, volatility, days)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.03, days))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(10, 1, days)
+    return pd.DataFrame({'timestamp': pd.date_range(start, periods=days, freq='D'),
+                         'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+
+def make_synthetic_universe(symbols=20, days=2500, volatility=0.04, seed=0):
+    return {f"SYM{i}/USDT": make_synthetic_ohlcv(days, seed=seed + i, volatility=volatility) for i in range(symbols)}
+
+
+# === Referans (eski döngülü) Volume Profile ===
+def reference_compute_volume_profile(df, tick_size=0.01, row_param=50):
+    high, low = df['high'].max(), df['low'].min()
+    price_range = high - low
+    price_step = max(tick_size, round((price_range / row_param) / tick_size) * tick_size)
+    bin_edges = np.arange(low, high + price_step, price_step)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    volume_sum = np.zeros(len(bin_centers))
+    for i in range(len(df)):
+        price = df['close'].iloc[i]
+        volume = df['volume'].iloc[i]
+        if pd.isna(price) or pd.isna(volume):
+            continue
+        bin_idx = int((price - low) // price_step)
+        if 0 <= bin_idx < len(bin_centers):
+            volume_sum[bin_idx] += volume
+    return pd.DataFrame({'price_level': bin_centers, 'total_volume': volume_sum})
+
+
+# === Referans (eski) AVWAP ===
+def reference_calculate_avwap(df, anchor_date="2020-03-18"):
+    avwap_anchor_date = pd.to_datetime(anchor_date)
+    start_point = avwap_anchor_date if df["timestamp"].min() <= avwap_anchor_date else df["timestamp"].iloc[1]
+    avwap_df = df[df["timestamp"] >= start_point].copy()
+    if avwap_df.empty or avwap_df["volume"].sum() == 0:
+        return None, None
+    tp = (avwap_df["high"] + avwap_df["low"] + avwap_df["close"]) / 3
+    volume = avwap_df["volume"]
+    avwap = (tp * volume).sum() / volume.sum()
+    std = np.sqrt(np.mean((tp - avwap) ** 2)) if len(tp) > 1 else 0
+    return avwap, avwap + 4 * std
+
+
+# === Referans (eski O(n²)) Value Area ===
+def reference_calculate_value_area_range(vp_df, value_area_pct=0.7):
+    df = vp_df[vp_df['total_volume'] > 0].sort_values(by='price_level').reset_index(drop=True)
+    total_volume = df['total_volume'].sum()
+    target_volume = total_volume * value_area_pct
+    min_range_width = float('inf')
+    val = vah = None
+    for i in range(len(df)):
+        cum_volume = 0
+        for j in range(i, len(df)):
+            cum_volume += df.at[j, 'total_volume']
+            if cum_volume >= target_volume:
+                width = df.at[j, 'price_level'] - df.at[i, 'price_level']
+                if width < min_range_width:
+                    min_range_width = width
+                    val, vah = df.at[i, 'price_level'], df.at[j, 'price_level']
+                break
+    return val, vah
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# En iyi süre (repeat tekrar) ve tracemalloc ile ölçülen en yüksek ek bellek
+def _measure(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        _, elapsed = _timed(fn)
+        best = min(best, elapsed)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+# === Volume Profile Karşılaştırması ===
+def bench_volume_profile(symbols=20, days=2500):
+    frames = {f"SYM{i}/USDT": make_synthetic_ohlcv(days, seed=i) for i in range(symbols)}
+    reference, t_ref = _timed(lambda: {s: reference_compute_volume_profile(df) for s, df in frames.items()})
+    single, t_single = _timed(lambda: {s: compute_volume_profile(df) for s, df in frames.items()})
+    batch, t_batch = _timed(compute_volume_profiles, frames)
+    _, t_range = _timed(compute_volume_profiles, frames, mode='range')
+    for symbol, expected in reference.items():
+        for got in (single[symbol], batch[symbol]):
+            if not expected.equals(got):
+                raise AssertionError(f"{symbol} için volume profile referanstan farklı")
+    print(f"Volume profile ({symbols} sembol x {days} gün) - çıktılar referansla birebir aynı")
+    print(f"  referans döngü : {t_ref * 1000:9.1f} ms")
+    print(f"  numpy (tekli)  : {t_single * 1000:9.1f} ms  ({t_ref / t_single:6.1f}x)")
+    print(f"  numpy (toplu)  : {t_batch * 1000:9.1f} ms  ({t_ref / t_batch:6.1f}x)")
+    print(f"  toplu, range   : {t_range * 1000:9.1f} ms")
+
+
+# === Value Area Karşılaştırması ===
+def bench_value_area(symbols=20, days=2500, row_params=(50, 200, 500)):
+    frames = [make_synthetic_ohlcv(days, seed=i) for i in range(symbols)]
+    for row_param in row_params:
+        profiles = [compute_volume_profile(df, row_param=row_param) for df in frames]
+        reference, t_ref = _timed(lambda: [reference_calculate_value_area_range(vp) for vp in profiles])
+        window, t_window = _timed(lambda: [calculate_value_area_range(vp) for vp in profiles])
+        _, t_poc = _timed(lambda: [calculate_value_area_range(vp, method='poc') for vp in profiles])
+        if reference != window:
+            raise AssertionError(f"row_param={row_param} için VAL/VAH referanstan farklı")
+        print(f"Value area ({symbols} profil, row_param={row_param}) - VAL/VAH referansla aynı")
+        print(f"  referans O(n²) : {t_ref * 1000:9.1f} ms")
+        print(f"  iki işaretçi   : {t_window * 1000:9.1f} ms  ({t_ref / t_window:6.1f}x)")
+        print(f"  POC genişleme  : {t_poc * 1000:9.1f} ms")
+
+
+# === Boyuta Göre Süre ve Bellek ===
+# Her fonksiyon için tek sembol uzunluğu büyütülerek süre (en iyi) ve tepe bellek raporlanır.
+def bench_sizes(sizes=(500, 2500, 10000, 50000), symbols=20, volatility=0.04, repeat=3):
+    print(f"{'fonksiyon':<28}{'mum':>8}{'süre (ms)':>12}{'tepe bellek (KB)':>18}")
+    for days in sizes:
+        df = make_synthetic_ohlcv(days, volatility=volatility)
+        vp = compute_volume_profile(df)
+        candles = CandleSet.from_frames({"SYM": df})
+        universe = CandleSet.from_frames(make_synthetic_universe(symbols, days, volatility))
+        cases = {
+            "calculate_avwap": lambda: calculate_avwap(df),
+            "calculate_avwaps (3 çapa)": lambda: calculate_avwaps(df, ("2020-03-18", "ath", "cycle_low")),
+            "compute_volume_profile": lambda: compute_volume_profile(df),
+            "compute_volume_profile range": lambda: compute_volume_profile(df, mode='range'),
+            "calculate_value_area_range": lambda: calculate_value_area_range(vp),
+            "avwap (CandleSet görünümü)": lambda: calculate_avwap(candles["SYM"]),
+            f"compute_panel_metrics x{symbols}": lambda: compute_panel_metrics(universe),
+        }
+        for name, fn in cases.items():
+            elapsed, peak = _measure(fn, repeat)
+            print(f"{name:<28}{days:>8}{elapsed * 1000:>12.2f}{peak / 1024:>18.1f}")
+
+
+# === Altın Çıktı Kontrolleri ===
+# 1) Optimize fonksiyonlar eski referans uygulamalarla karşılaştırılır.
+# 2) Referansı olmayan yollar (panel, CandleSet, artımlı durum) doğrudan yolla karşılaştırılır.
+# 3) Özet sayılar benchmark_golden.json ile karşılaştırılır; --update-golden ile yeniden yazılır. Dosyada
+#    olmayan ayarlar (sembol x gün @ oynaklık) sessizce eklenmez, kontrol başarısız olur.
+def golden_outputs(frames):
+    outputs = {}
+    for symbol, df in frames.items():
+        avwap, upper = calculate_avwap(df)
+        vp = compute_volume_profile(df)
+        vp_range = compute_volume_profile(df, mode='range')
+        outputs[symbol] = {
+            "avwap": avwap, "avwap_upper": upper,
+            "vp_total": float(vp['total_volume'].sum()), "value_area": list(calculate_value_area_range(vp)),
+            "value_area_poc": list(calculate_value_area_range(vp, method='poc')),
+            "vp_range_total": float(vp_range['total_volume'].sum()),
+            "value_area_range": list(calculate_value_area_range(vp_range)),
+        }
+    return outputs
+
+
+def _close(a, b, rtol=1e-9):
+    if a is None or b is None:
+        return a is b
+    return bool(np.isclose(a, b, rtol=rtol, atol=0, equal_nan=True))
+
+
+def check_golden(symbols=10, days=2500, volatility=0.04, golden_path=GOLDEN_PATH, update=False):
+    frames = make_synthetic_universe(symbols, days, volatility)
+    failures = []
+    candles = CandleSet.from_frames(frames)
+    panel = compute_panel_metrics(candles)
+    for symbol, df in frames.items():
+        expected_avwap = reference_calculate_avwap(df)
+        if not all(_close(a, b) for a, b in zip(calculate_avwap(df), expected_avwap)):
+            failures.append(f"{symbol}: calculate_avwap")
+        if not all(_close(a, b) for a, b in zip(calculate_avwap(candles[symbol]), expected_avwap)):
+            failures.append(f"{symbol}: calculate_avwap (CandleSet)")
+        if not _close(calculate_avwaps(df)["avwap"].iloc[0], expected_avwap[0]):
+            failures.append(f"{symbol}: calculate_avwaps")
+        # Çapadan sonra başlayan veri: iki fonksiyon da ikinci mumdan başlamalı
+        late = df.iloc[500:].reset_index(drop=True)
+        if not _close(calculate_avwaps(late)["+4σ"].iloc[0], reference_calculate_avwap(late)[1]):
+            failures.append(f"{symbol}: calculate_avwaps (çapa veriden önce)")
+        vp = compute_volume_profile(df)
+        if not vp.equals(reference_compute_volume_profile(df)):
+            failures.append(f"{symbol}: compute_volume_profile")
+        if calculate_value_area_range(vp) != reference_calculate_value_area_range(vp):
+            failures.append(f"{symbol}: calculate_value_area_range")
+        ath_date = df.loc[df['high'].idxmax(), 'timestamp']
+        ath_vp = compute_volume_profile(df[df['timestamp'] >= ath_date])
+        expected_val, expected_vah = calculate_value_area_range(ath_vp)
+        if not (_close(panel.loc[symbol, 'AVWAP'], expected_avwap[0])
+                and _close(panel.loc[symbol, 'AVWAP +4σ'], expected_avwap[1])
+                and _close(panel.loc[symbol, 'POC'], ath_vp.loc[ath_vp['total_volume'].idxmax(), 'price_level'])
+                and _close(panel.loc[symbol, 'VAL'], expected_val) and _close(panel.loc[symbol, 'VAH'], expected_vah)):
+            failures.append(f"{symbol}: compute_panel_metrics")
+        # Artımlı toplamlar farklı sırayla eklendiği için tam eşitlik değil göreli tolerans beklenir
+        state = None
+        for end in (len(df) - 30, len(df) - 29, len(df)):
+            indicators, state = update_indicator_state(df.iloc[:end], state)
+        if not (_close(indicators['avwap'], expected_avwap[0], rtol=1e-7)
+                and np.allclose(indicators['vp']['total_volume'], ath_vp['total_volume'], rtol=1e-9, atol=0)):
+            failures.append(f"{symbol}: update_indicator_state")
+
+    # Fiyat ölçekleri çok farklı semboller aynı panelde (BTC ile SHIB gibi) σ'yı birbirine kaydırmamalı
+    scaled = {}
+    for i, (symbol, df) in enumerate(frames.items()):
+        df = df.copy()
+        df[['open', 'high', 'low', 'close']] *= 10.0 ** (4 if i % 2 == 0 else -8)
+        scaled[symbol] = df
+    scaled_panel = compute_panel_metrics(CandleSet.from_frames(scaled), with_profile=False)
+    for symbol, df in scaled.items():
+        expected_avwap = reference_calculate_avwap(df)
+        if not (_close(scaled_panel.loc[symbol, 'AVWAP'], expected_avwap[0], rtol=1e-7)
+                and _close(scaled_panel.loc[symbol, 'AVWAP +4σ'], expected_avwap[1], rtol=1e-7)):
+            failures.append(f"{symbol}: compute_panel_metrics (karışık fiyat ölçekleri)")
+
+    outputs = golden_outputs(frames)
+    key = f"{symbols}x{days}@{volatility}"
+    stored = {}
+    if os.path.exists(golden_path):
+        with open(golden_path, encoding="utf-8") as f:
+            stored = json.load(f)
+    if update:
+        stored[key] = outputs
+        with open(golden_path, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=1, default=float)
+        print(f"Altın çıktılar yazıldı: {golden_path} [{key}]")
+    elif key not in stored:
+        failures.append(f"{key} için altın çıktı yok; bu ayarlar için --update-golden ile yazın")
+    else:
+        for symbol, values in outputs.items():
+            for name, got in values.items():
+                if name not in stored[key].get(symbol, {}):
+                    failures.append(f"{symbol}: {name} altın çıktıda yok (--update-golden)")
+                    continue
+                value = stored[key][symbol][name]
+                pairs = zip(got, value) if isinstance(value, list) else [(got, value)]
+                if not all(_close(a, b) for a, b in pairs):
+                    failures.append(f"{symbol}: {name} altın çıktıdan farklı ({got} != {value})")
+
+    for failure in failures:
+        print(f"  HATA {failure}")
+    print(f"Altın kontroller ({symbols} sembol x {days} gün): {'BAŞARISIZ' if failures else 'tamam'}")
+    return not failures
+
+
+# === Oynatmalı Tarama ===
+# Tam tarama ağsız oynatma borsasıyla (hocalar_replay) geçici bir depoya karşı çalıştırılır: ilk tur tüm
+# mumları indirir, ikinci tur depodan artımlı günceller. Gecikme ve 429 oranıyla yük testi yapılabilir.
+def bench_replay_scan(symbols=50, latency=0.0, error_rate=0.0, workers=8):
+    import tempfile
+    from hocalar_metrics import current
+    from hocalar_replay import REPLAY_EXCHANGE_ID, install_replay
+    from hocalar_scan import ScanParams, run_scan
+
+    with tempfile.TemporaryDirectory() as tmp:
+        install_replay(symbols=symbols, latency=latency, error_rate=error_rate,
+                       store_path=os.path.join(tmp, "candles.sqlite"))
+        params = ScanParams(exchange_id=REPLAY_EXCHANGE_ID, max_workers=workers)
+        print(f"Oynatmalı tarama ({symbols} sembol, gecikme {latency * 1000:.0f} ms, hata oranı {error_rate:.0%}):")
+        for label in ("soğuk", "sıcak"):
+            start = time.perf_counter()
+            frame = run_scan(params)
+            seconds = time.perf_counter() - start
+            counters = current().snapshot()["counters"]
+            print(f"  {label:<6} {seconds:8.2f} s  satır {len(frame):4d}  istek {counters.get('requests:ccxt', 0):5d}"
+                  f"  yeniden deneme {counters.get('retries:ccxt', 0):4d}")
+
+
+# === Geçmiş Tarama (backtest) ===
+# Tek geçişli nokta-zaman göstergeleri, her gün için compute_symbol_metrics'i baştan çalıştırmakla
+# karşılaştırılır; naif süre örneklenen günlerden tüm geçmişe ölçeklenir.
+def bench_backtest(symbols=5, days=2500, sample=50):
+    from hocalar_backtest import build_backtest_panel
+    from hocalar_scan import MIN_CANDLES, compute_symbol_metrics
+
+    frames = make_synthetic_universe(symbols, days)
+    _, sweep = _timed(build_backtest_panel, frames)
+    ends = np.linspace(MIN_CANDLES, days, sample).astype(int)
+    start = time.perf_counter()
+    for df in frames.values():
+        for end in ends:
+            compute_symbol_metrics(df.iloc[:end])
+    naive = (time.perf_counter() - start) * (days - MIN_CANDLES + 1) / sample
+    print(f"Backtest ({symbols} sembol x {days} gün): tek geçiş {sweep:.2f} s, günlük yeniden hesap ~{naive:.1f} s"
+          f" ({naive / sweep:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gösterge fonksiyonları için çevrimdışı benchmark")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--days", type=int, default=2500)
+    parser.add_argument("--volatility", type=float, default=0.04)
+    parser.add_argument("--sizes", default="500,2500,10000,50000", help="bench_sizes için mum sayıları")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", choices=["golden", "sizes", "compare", "replay", "backtest"], default=None,
+                        help="Sadece altın kontrolleri, boyut taraması, referans karşılaştırması, oynatmalı tarama ya da backtest")
+    parser.add_argument("--replay-latency", type=float, default=0.0, help="Oynatmalı taramada istek gecikmesi (sn)")
+    parser.add_argument("--replay-error-rate", type=float, default=0.0, help="Oynatmalı taramada 429 oranı")
+    parser.add_argument("--golden", default=GOLDEN_PATH)
+    parser.add_argument("--update-golden", action="store_true")
+    args = parser.parse_args()
+    ok = True
+    if args.only in (None, "golden"):
+        ok = check_golden(min(args.symbols, 10), args.days, args.volatility, args.golden, args.update_golden)
+    if args.only in (None, "compare"):
+        bench_volume_profile(args.symbols, args.days)
+        bench_value_area(args.symbols, args.days)
+    if args.only in (None, "sizes"):
+        bench_sizes(tuple(int(n) for n in args.sizes.split(",")), args.symbols, args.volatility, args.repeat)
+    if args.only == "replay":
+        bench_replay_scan(args.symbols, args.replay_latency, args.replay_error_rate)
+    if args.only == "backtest":
+        bench_backtest(min(args.symbols, 5), args.days)
+    sys.exit(0 if ok else 1)
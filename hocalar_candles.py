@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# === Sütunlu Mum Kümesi ===
+# Tüm semboller tek bitişik dizilerde tutulur: int64 epoch-ms zaman damgaları, float sütunlar ve
+# sembol başına offsets[i]:offsets[i+1] aralığı. Sembol, çapa ve ATH pencereleri kopya değil görünümdür.
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+# === Tek Sembol Görünümü ===
+# df["high"] gibi erişim ham NumPy dizisini döndürür; bu sayede gösterge fonksiyonları DataFrame
+# yerine doğrudan bunu alabilir.
+class Candles:
+    __slots__ = ('symbol', 'timestamp') + PRICE_COLUMNS
+
+    def __init__(self, symbol, timestamp, open, high, low, close, volume):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def empty(self):
+        return len(self.timestamp) == 0
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, col).nbytes for col in ('timestamp',) + PRICE_COLUMNS)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return Candles(self.symbol, *(getattr(self, col)[key] for col in ('timestamp',) + PRICE_COLUMNS))
+
+    # ts_ms ve sonrasındaki mumlar (çapa penceresi)
+    def since(self, ts_ms):
+        return self[int(np.searchsorted(self.timestamp, ts_ms)):]
+
+    # İlk ATH mumundan itibaren (volume profile penceresi)
+    def ath_window(self):
+        return self[int(np.nanargmax(self.high)):] if len(self) else self
+
+    def to_frame(self):
+        frame = {'timestamp': pd.to_datetime(self.timestamp, unit='ms')}
+        frame.update({col: getattr(self, col) for col in PRICE_COLUMNS})
+        return pd.DataFrame(frame)
+
+
+class CandleSet:
+    def __init__(self, symbols, offsets, timestamp, open, high, low, close, volume):
+        self.symbols = list(symbols)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    # Diziler bir kez ayrılır ve her sembol yerine kopyalanır; ara birleştirme (concat) yapılmaz
+    @classmethod
+    def from_frames(cls, frames, min_candles=0, dtype=np.float64):
+        frames = {symbol: df for symbol, df in frames.items() if len(df) >= max(min_candles, 1)}
+        counts = [len(df) for df in frames.values()]
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        total = int(offsets[-1])
+        timestamp = np.empty(total, dtype=np.int64)
+        columns = {col: np.empty(total, dtype=dtype) for col in PRICE_COLUMNS}
+        for i, df in enumerate(frames.values()):
+            start, end = offsets[i], offsets[i + 1]
+            ts = df['timestamp']
+            timestamp[start:end] = ts if isinstance(ts, np.ndarray) and ts.dtype == np.int64 else \
+                np.asarray(ts, dtype='datetime64[ms]').astype(np.int64)
+            for col in PRICE_COLUMNS:
+                columns[col][start:end] = df[col]
+        return cls(frames.keys(), offsets, timestamp, **columns)
+
+    # SQLite deposundan DataFrame oluşturmadan doğrudan yükler
+    @classmethod
+    def from_store(cls, store, exchange_id, symbols, timeframe='1d', min_candles=0, dtype=np.float64):
+        loaded = {}
+        for symbol in symbols:
+            rows = store.load(exchange_id, symbol, timeframe)
+            if len(rows) >= max(min_candles, 1):
+                loaded[symbol] = np.array(rows, dtype=np.float64)
+        counts = [len(rows) for rows in loaded.values()]
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        stacked = np.concatenate(list(loaded.values())) if loaded else np.empty((0, 6))
+        columns = {col: np.ascontiguousarray(stacked[:, i + 1], dtype=dtype) for i, col in enumerate(PRICE_COLUMNS)}
+        return cls(loaded.keys(), offsets, stacked[:, 0].astype(np.int64), **columns)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._index
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __getitem__(self, symbol):
+        i = self._index[symbol]
+        window = slice(self.offsets[i], self.offsets[i + 1])
+        return Candles(symbol, *(getattr(self, col)[window] for col in ('timestamp',) + PRICE_COLUMNS))
+
+    def items(self):
+        return ((symbol, self[symbol]) for symbol in self.symbols)
+
+    @property
+    def counts(self):
+        return np.diff(self.offsets)
+
+    # Satır başına sembol numarası (gruplu işlemler için)
+    def codes(self):
+        return np.repeat(np.arange(len(self.symbols)), self.counts)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, col).nbytes for col in ('timestamp', 'offsets') + PRICE_COLUMNS)
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+from hocalar_archive import build_archive
+from hocalar_exchange import default_exchange_id
+from hocalar_export import write_excel
+from hocalar_fetch import run_concurrently
+from hocalar_metrics import METRICS_DIR, stage, start_run, write_log
+from hocalar_replay import REPLAY_EXCHANGE_ID, install_recording, install_replay
+from hocalar_scan import (SNAPSHOT_DIR, ScanParams, analyze_panel, analyze_processes, analyze_symbol,
+                          build_result_frame, enrich_rows, fetch_usdt_symbols, resolve_processes, select_universe,
+                          snapshot_name, snapshot_params)
+from hocalar_store import get_store
+
+# === Çıkış Kodları ===
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_LOCKED = 75  # EX_TEMPFAIL: önceki çalışma sürüyor, cron bir sonraki turda tekrar dener
+
+WRITERS = {
+    "parquet": lambda df, path: df.to_parquet(path, index=False),
+    "csv": lambda df, path: df.to_csv(path, index=False),
+    "xlsx": lambda df, path: write_excel(df, path),
+}
+
+
+# === Kilit Dosyası ===
+# Dosya O_EXCL ile oluşturulur; içindeki PID artık yaşamıyorsa kilit bayat sayılıp silinir.
+def acquire_lock(path):
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(path) as f:
+                    pid = int(f.read().strip() or 0)
+                os.kill(pid, 0)
+                return False
+            except (ValueError, ProcessLookupError):
+                os.remove(path)
+                continue
+            except PermissionError:
+                return False
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def release_lock(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# === Çıktıları Yaz ===
+# Önce zaman damgalı dosya yazılır, sonra <ad>_latest kopyası atomik olarak değiştirilir.
+# meta verilirse (tarama parametreleri) <ad>_latest.json'a yazılır; panolar çıktıyı buna göre eşleştirir.
+def write_outputs(df, out_dir, name, formats, timings, meta=None):
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    written = []
+    for fmt in formats:
+        start = time.perf_counter()
+        path = os.path.join(out_dir, f"{name}_{stamp}.{fmt}")
+        try:
+            with stage(f"write:{fmt}"):
+                WRITERS[fmt](df, path)
+        except Exception as e:
+            print(f"{fmt} çıktısı yazılamadı: {e}", file=sys.stderr)
+            continue
+        latest = os.path.join(out_dir, f"{name}_latest.{fmt}")
+        tmp = latest + ".tmp"
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, latest)
+        timings[f"yaz:{fmt}"] = time.perf_counter() - start
+        written.append(path)
+    if written and meta is not None:
+        latest = os.path.join(out_dir, f"{name}_latest.json")
+        with open(latest + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"params": meta, "written_at": stamp}, f, ensure_ascii=False)
+        os.replace(latest + ".tmp", latest)
+    return written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AVWAP & Volume Profile taramasını Streamlit olmadan çalıştırır")
+    parser.add_argument("--exchange", default=None,
+                        help="ccxt borsa kimliği (varsayılan: HOCALAR_EXCHANGE ya da yapılandırma dosyası)")
+    parser.add_argument("--quote", default="USDT")
+    parser.add_argument("--timeframe", default="1d")
+    parser.add_argument("--symbols", default="", help="Virgülle ayrılmış semboller, örn. BTC/USDT,ETH/USDT")
+    parser.add_argument("--max-symbols", type=int, default=0, help="0 = tümü")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Göstergeleri bu kadar alt süreçte hesapla (0/1 = bu süreçte; HOCALAR_PROCESSES geçersiz kılar)")
+    parser.add_argument("--anchor-date", default="2020-03-18")
+    parser.add_argument("--extra-anchors", default="",
+                        help="Virgülle ayrılmış ek AVWAP çapaları: ath, cycle_low, listing ya da tarih")
+    parser.add_argument("--extra-timeframes", default="",
+                        help="Virgülle ayrılmış ek zaman dilimleri, örn. 4h,1w,1M (türetilebilenler yeniden örneklenir)")
+    parser.add_argument("--profile-timeframe", default="",
+                        help="Volume profile'i bu zaman diliminin mumlarından kur, örn. 1h (boş: ana zaman dilimi)")
+    parser.add_argument("--rows", type=int, default=50, help="Volume profile satır sayısı (row_param)")
+    parser.add_argument("--provider", default="defillama", choices=["defillama", "coingecko"])
+    parser.add_argument("--long-names", action="store_true", help="Uzun token adlarıyla eşleştir (kripto_4 düzeni)")
+    parser.add_argument("--offline", action="store_true", help="Sadece yerel mum deposunu kullan")
+    parser.add_argument("--panel", action="store_true", help="Göstergeleri tüm semboller için tek panelde hesapla")
+    parser.add_argument("--out-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--name", default=None, help="Çıktı dosya adı öneki (varsayılan: parametre profili)")
+    parser.add_argument("--formats", default="parquet,csv,xlsx")
+    parser.add_argument("--lock-file", default=None)
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Tarama sonunda bellek eşlemeli mum arşivini yenileme")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR,
+                        help="Aşama süreleri ve API sayaçlarının JSON günlüğü (boş: yazma)")
+    parser.add_argument("--replay", default=None, metavar="KAYNAK",
+                        help="Ağsız çalış: 'synthetic' ya da --record ile alınmış kayıt klasörü (ayrı mum deposu)")
+    parser.add_argument("--replay-latency", type=float, default=0.0, help="Oynatmada istek başına gecikme (sn)")
+    parser.add_argument("--replay-error-rate", type=float, default=0.0, help="Oynatmada 429 dönen istek oranı")
+    parser.add_argument("--record", default=None, metavar="KLASÖR",
+                        help="Borsa ve HTTP yanıtlarını oynatma için bu klasöre kaydet")
+    return parser.parse_args(argv)
+
+
+# === Ana İşlem ===
+def main(argv=None):
+    args = parse_args(argv)
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in WRITERS]
+    if unknown:
+        print(f"Bilinmeyen çıktı biçimi: {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_FAILED
+    recording = None
+    if args.replay:
+        install_replay(args.replay, latency=args.replay_latency, error_rate=args.replay_error_rate)
+    elif args.record:
+        recording = install_recording(args.exchange)
+    exchange_id = REPLAY_EXCHANGE_ID if args.replay else args.exchange or default_exchange_id()
+    params = ScanParams(exchange_id=exchange_id, quote=args.quote, timeframe=args.timeframe,
+                        symbols=tuple(s.strip() for s in args.symbols.split(",") if s.strip()),
+                        max_symbols=args.max_symbols, anchor_date=args.anchor_date,
+                        extra_anchors=tuple(a.strip() for a in args.extra_anchors.split(",") if a.strip()),
+                        extra_timeframes=tuple(t.strip() for t in args.extra_timeframes.split(",") if t.strip()),
+                        profile_timeframe=args.profile_timeframe, row_param=args.rows,
+                        provider=args.provider, long_names=args.long_names, offline=args.offline,
+                        panel=args.panel, max_workers=args.workers, processes=args.processes)
+    name = args.name or snapshot_name(params)
+    os.makedirs(args.out_dir, exist_ok=True)
+    lock_file = args.lock_file or os.path.join(args.out_dir, f".{name}.lock")
+    if not acquire_lock(lock_file):
+        print(f"Başka bir tarama çalışıyor ({lock_file})", file=sys.stderr)
+        return EXIT_LOCKED
+
+    timings = {}
+    metrics = start_run(name)
+    try:
+        start = time.perf_counter()
+        with stage("symbols"):
+            universe = select_universe(fetch_usdt_symbols(params.exchange_id, params.quote), params)
+        timings["semboller"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processes = resolve_processes(params.processes)
+        if params.panel:
+            rows = analyze_panel(universe, params)
+        elif processes:
+            rows = analyze_processes(universe, params, processes)
+        else:
+            rows = run_concurrently(universe, lambda item: analyze_symbol(*item, params=params),
+                                    max_workers=params.max_workers)
+            rows = [row for row in rows if row]
+        timings["mumlar+göstergeler"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with stage("enrich"):
+            market_data = enrich_rows(rows, params)
+        df_result = build_result_frame(rows, market_data, params.long_names, params.extra_anchors,
+                                       params.extra_timeframes)
+        timings["zenginleştirme"] = time.perf_counter() - start
+
+        written = write_outputs(df_result, args.out_dir, name, formats, timings, meta=snapshot_params(params))
+
+        # Panoların soğuk başlangıcı için depodaki mumlar bellek eşlemeli arşive yazılır
+        if not args.no_archive and not params.offline:
+            start = time.perf_counter()
+            with stage("archive"):
+                build_archive(get_store(), params.exchange_id, [item[0] for item in universe], params.timeframe,
+                              merge=bool(params.symbols))
+            timings["arşiv"] = time.perf_counter() - start
+    except Exception as e:
+        print(f"Tarama başarısız: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        release_lock(lock_file)
+        if recording is not None:
+            recording.save(args.record)
+            print(f"Yanıtlar kaydedildi: {args.record}")
+        metrics.finish()
+        if args.metrics_dir:
+            print(f"Ölçüm günlüğü: {write_log(metrics, args.metrics_dir)}")
+
+    print(f"{len(df_result)}/{len(universe)} sembol tarandı, {len(written)} dosya yazıldı")
+    for label, seconds in timings.items():
+        print(f"  {label:<20} {seconds:8.2f} s")
+    counters = metrics.snapshot()["counters"]
+    print(f"  {'ccxt istekleri':<20} {counters.get('requests:ccxt', 0):8d}"
+          f"  (yeniden deneme: {counters.get('retries:ccxt', 0)})")
+    if not universe or df_result.empty or len(written) < len(formats):
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
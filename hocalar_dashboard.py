@@ -0,0 +1,135 @@
+import time
+
+import ccxt
+import pandas as pd
+import streamlit as st
+
+from hocalar_export import EXPORT_FORMATS, available_formats, export_bytes, frame_digest
+from hocalar_metrics import metrics_tables, stage
+from hocalar_scan import (ScanParams, invalidate_scan_cache, iter_scan_result, load_latest_snapshot,
+                          partial_result_frame, summarize_statuses)
+
+# === Tarama Panoları için Ortak Bölümler ===
+# hocalar_krpt.py, hocalar_krpt_2.py, hocalar_krpto_3.py ve hocalar_kripto_4.py aynı kenar çubuğunu,
+# akışlı tarama tablosunu, indirme bölümünü ve performans panelini kullanır; farkları başlık ve
+# ScanParams varsayılanlarıdır (provider, long_names).
+
+
+# === Kenar Çubuğu ===
+# fixed: panoya özgü ScanParams alanları, örn. provider='coingecko', long_names=True
+def scan_sidebar(**fixed):
+    offline_mode = st.sidebar.checkbox("Sadece önbellekteki mumları kullan (çevrimdışı)", value=False)
+    max_symbols = st.sidebar.number_input("Taranacak sembol sayısı (0 = tümü)", min_value=0, value=0, step=10)
+    max_workers = st.sidebar.slider("Eşzamanlı indirme sayısı", 1, 16, 8)
+    # Streamlit Cloud'da yok sayılır, hesaplar sırayla yapılır
+    processes = st.sidebar.number_input("Hesaplama süreci sayısı (0 = kapalı)", min_value=0, max_value=32, value=0)
+    extra_anchors = st.sidebar.multiselect("Ek AVWAP çapaları", ["ath", "cycle_low", "listing"])
+    extra_timeframes = st.sidebar.multiselect("Ek zaman dilimleri", ["4h", "1w", "1M"])
+    profile_timeframe = st.sidebar.selectbox("Volume profile mumları", ["", "1h", "15m"],
+                                             format_func=lambda tf: tf or "Ana zaman dilimi")
+    use_snapshot = st.sidebar.checkbox("Hazır tarama çıktısını kullan (hocalar_cli.py)", value=True)
+    # Yeniden tarama o ana kadar yazılmış hazır çıktıları da atlar; cron daha yeni bir çıktı yazınca o kullanılır
+    if st.sidebar.button("Yeniden tara"):
+        invalidate_scan_cache()
+        st.session_state["snapshot_dismissed_at"] = time.time()
+    # Önceki tarama yarıda kesildiyse (sayfa yeniden çalıştı) o ana kadarki sonuçlar indirilebilir
+    if "partial_rows" in st.session_state:
+        rows, partial_params = st.session_state["partial_rows"]
+        st.sidebar.download_button("Yarım kalan taramayı indir (CSV)",
+                                   data=partial_result_frame(rows, partial_params).to_csv(index=False).encode("utf-8"),
+                                   file_name="kripto_analiz_yarim.csv", mime="text/csv")
+    params = ScanParams(max_symbols=int(max_symbols), extra_anchors=tuple(extra_anchors),
+                        extra_timeframes=tuple(extra_timeframes), profile_timeframe=profile_timeframe,
+                        offline=offline_mode, max_workers=max_workers, processes=int(processes), **fixed)
+    return params, use_snapshot
+
+
+# === Tarama ===
+# Hazır çıktı yoksa satırlar sembol bittikçe tabloya eklenir, piyasa verileri tarama sonunda toplu doldurulur.
+# Her satır bir kez tabloya çevrilir; canlı tablo en fazla TABLE_REFRESH_SECONDS'ta bir yeniden çizilir
+# (güncel Streamlit'te add_rows yok), böylece çizim maliyeti satır başına tüm tablo olmaz.
+# (sonuç tablosu, tablo yer tutucusu) döner; pano son tabloyu (filtrelenmiş olabilir) aynı yer tutucuya çizer.
+TABLE_REFRESH_SECONDS = 0.5
+
+
+def scan_section(params, use_snapshot):
+    progress_bar = st.progress(0.0)
+    status_text = st.empty()
+    table = st.empty()
+    snapshot = load_latest_snapshot(params) if use_snapshot else None
+    if snapshot is not None and snapshot[1].timestamp() <= st.session_state.get("snapshot_dismissed_at", 0):
+        snapshot = None
+    if snapshot is not None:
+        df_result, snapshot_time = snapshot
+        st.session_state.pop("scan_metrics", None)
+        age = pd.Timestamp.now() - snapshot_time
+        st.caption(f"Hazır tarama çıktısı: {snapshot_time:%Y-%m-%d %H:%M} ({age.total_seconds() / 3600:.1f} saat önce)"
+                   " · güncel tarama için 'Yeniden tara'")
+        # Bir mum periyodundan eski çıktı son kapanan mumu içermiyor olabilir
+        if age.total_seconds() > ccxt.Exchange.parse_timeframe(params.timeframe):
+            st.warning("Hazır tarama çıktısı son mum periyodundan eski; cron çalışmıyor olabilir.")
+    else:
+        rows, row_frames, statuses, failed = [], [], {}, []
+        st.session_state["partial_rows"] = (rows, params)
+        drawn, last_draw = 0, 0.0
+        for event in iter_scan_result(params):
+            if event.symbol:
+                statuses[event.symbol] = event.status
+            if event.status == 'failed':
+                failed.append(f"{event.symbol} ({event.error})")
+            if event.row:
+                rows.append(event.row)
+                row_frames.append(partial_result_frame([event.row], params))
+            if len(row_frames) > drawn and time.monotonic() - last_draw >= TABLE_REFRESH_SECONDS:
+                table.dataframe(pd.concat(row_frames, ignore_index=True), use_container_width=True)
+                drawn, last_draw = len(row_frames), time.monotonic()
+            if event.total:
+                progress_bar.progress(event.done / event.total,
+                                      text=f"{event.done}/{event.total} {event.symbol or ''}")
+            if event.status == 'enriching':
+                status_text.caption("Piyasa verileri ekleniyor...")
+            else:
+                status_text.caption(summarize_statuses(statuses))
+            df_result = event.frame
+        # Önbellekten gelen sonuçta da o sonucu üreten taramanın ölçümleri gösterilir
+        st.session_state["scan_metrics"] = event.metrics
+        st.session_state.pop("partial_rows", None)
+        if failed:
+            st.warning("İşlenemeyen semboller: " + ", ".join(failed))
+    progress_bar.empty()
+    status_text.empty()
+    return df_result, table
+
+
+# === İndirme ===
+# Dosya sadece istenince üretilir; aynı tablo ve biçim için baytlar önbellekten gelir (hocalar_export)
+def export_section(df, file_stem="kripto_analiz"):
+    export_format = st.selectbox("İndirme biçimi", available_formats(),
+                                 format_func=lambda fmt: EXPORT_FORMATS[fmt][0])
+    export_key = (frame_digest(df), export_format)
+    if st.button("İndirme dosyasını hazırla"):
+        st.session_state["export_key"] = export_key
+    if st.session_state.get("export_key") == export_key:
+        with stage("export"):
+            export_data = export_bytes(df, export_format, digest=export_key[0])
+        st.download_button(f"{EXPORT_FORMATS[export_format][0]} olarak indir", data=export_data,
+                           file_name=f"{file_stem}.{export_format}", mime=EXPORT_FORMATS[export_format][1])
+
+
+# === Performans ===
+# Gösterilen tablonun taramasına ait aşama süreleri, API sayaçları ve önbellek isabetleri (oturuma özel);
+# aynı bilgiler tarama bitince JSON günlüğüne de yazılır (METRICS_DIR)
+def performance_section():
+    with st.sidebar.expander("Performance"):
+        metrics = st.session_state.get("scan_metrics")
+        if metrics is None:
+            st.caption("Hazır tarama çıktısı kullanıldı; ölçümler tarama çalıştırılınca gösterilir.")
+            return
+        run_metrics = metrics.snapshot()
+        stages_df, counters_df, symbols_df = metrics_tables(run_metrics)
+        st.caption(f"{run_metrics['label']} - {run_metrics['started']} - {run_metrics['wall_seconds']:.1f} s")
+        st.dataframe(stages_df, hide_index=True, use_container_width=True)
+        st.dataframe(counters_df, hide_index=True, use_container_width=True)
+        if not symbols_df.empty:
+            st.caption("En yavaş semboller (s)")
+            st.dataframe(symbols_df, use_container_width=True)
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hocalar_metrics import InstrumentedSession, cache_event, stage
+
+# === Ayarlar ===
+ENRICH_COLUMNS = ["Market Cap", "Circulating Supply", "Total Supply", "TVL"]
+REQUEST_TIMEOUT = 15
+ID_MAP_TTL = 24 * 3600
+# Coin listesi alınamazsa bu süre boyunca boş liste kullanılır; kesinti sırasında her çağrı yeniden indirmez
+ID_MAP_RETRY = 60
+MARKET_DATA_TTL = 300
+TVL_TTL = 3600
+
+
+def empty_market_data():
+    return {col: None for col in ENRICH_COLUMNS}
+
+
+# === Süreli (TTL) ve Boyut Sınırlı Önbellek ===
+class TTLCache:
+    _MISSING = object()
+
+    def __init__(self, ttl, maxsize=4096, name=None):
+        self.ttl = ttl
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, self._MISSING)
+            if item is not self._MISSING and item[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                if item is not self._MISSING:
+                    del self._data[key]
+                self.misses += 1
+                hit = False
+        if self.name:
+            cache_event(self.name, hit)
+        return item[1] if hit else default
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# === DefiLlama ===
+class DefiLlamaProvider:
+    name = "defillama"
+    batch_size = 100
+
+    def load_id_maps(self, session):
+        response = session.get("https://coins.llama.fi/list", timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        by_symbol, by_name = {}, {}
+        for item in response.json()['coins'].values():
+            by_symbol[item.get('symbol', '').lower()] = item['id']
+            by_name[item.get('name', '').lower()] = item['id']
+        return by_symbol, by_name
+
+    # prices/current virgülle ayrılmış birden çok coin kimliğini tek istekte kabul eder
+    def fetch_batch(self, session, coin_ids):
+        url = f"https://coins.llama.fi/prices/current/{','.join(coin_ids)}"
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return {coin_id: {
+            "Market Cap": data.get("mc"),
+            "Circulating Supply": data.get("circulatingSupply"),
+            "Total Supply": data.get("totalSupply"),
+            "TVL": data.get("tvl"),
+        } for coin_id, data in response.json().get('coins', {}).items()}
+
+
+# === CoinGecko ===
+# /coins/markets birden çok kimliği tek istekte döndürür ancak TVL alanı içermez; TVL coin başına /coins/{id}
+# isteğiyle alınır ve TVL_TTL boyunca saklanır. Bir TVL isteği hata verirse partinin kalanı için denenmez.
+class CoinGeckoProvider:
+    name = "coingecko"
+    batch_size = 250
+
+    def __init__(self):
+        self.tvl = TTLCache(TVL_TTL, name="coingecko_tvl")
+
+    def load_id_maps(self, session):
+        response = session.get("https://api.coingecko.com/api/v3/coins/list", timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        by_symbol, by_name = {}, {}
+        for item in response.json():
+            by_symbol[item['symbol'].lower()] = item['id']
+            by_name[item['name'].lower()] = item['id']
+        return by_symbol, by_name
+
+    def fetch_batch(self, session, coin_ids):
+        response = session.get("https://api.coingecko.com/api/v3/coins/markets", timeout=REQUEST_TIMEOUT,
+                               params={"vs_currency": "usd", "ids": ",".join(coin_ids), "per_page": self.batch_size})
+        response.raise_for_status()
+        results = {item['id']: {
+            "Market Cap": item.get("market_cap"),
+            "Circulating Supply": item.get("circulating_supply"),
+            "Total Supply": item.get("total_supply"),
+            "TVL": None,
+        } for item in response.json()}
+        for coin_id, data in results.items():
+            cached = self.tvl.get(coin_id)
+            if cached is None:
+                try:
+                    cached = (self.fetch_tvl(session, coin_id),)
+                except Exception as e:
+                    print(f"coingecko TVL alınamadı ({coin_id}):", e)
+                    break
+                self.tvl.set(coin_id, cached)
+            data["TVL"] = cached[0]
+        return results
+
+    def fetch_tvl(self, session, coin_id):
+        response = session.get(f"https://api.coingecko.com/api/v3/coins/{coin_id}", timeout=REQUEST_TIMEOUT,
+                               params={"localization": "false", "tickers": "false", "community_data": "false",
+                                       "developer_data": "false"})
+        response.raise_for_status()
+        tvl = (response.json().get("market_data") or {}).get("total_value_locked")
+        return tvl.get("usd") if isinstance(tvl, dict) else tvl
+
+
+PROVIDERS = {
+    "defillama": DefiLlamaProvider,
+    "coingecko": CoinGeckoProvider,
+}
+
+
+# === Zenginleştirme İstemcisi ===
+class EnrichmentClient:
+    def __init__(self, provider, session=None):
+        self.provider = provider
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+            session.mount("https://", adapter)
+        self.session = InstrumentedSession(session, provider.name)
+        self.id_maps = TTLCache(ID_MAP_TTL, maxsize=1, name=f"{provider.name}_id_map")
+        self.market_data = TTLCache(MARKET_DATA_TTL, name=f"{provider.name}_market_data")
+        self._lock = threading.Lock()
+
+    def _get_id_maps(self):
+        maps = self.id_maps.get("maps")
+        if maps is None:
+            with self._lock:
+                maps = self.id_maps.get("maps")
+                if maps is None:
+                    try:
+                        maps = self.provider.load_id_maps(self.session)
+                        self.id_maps.set("maps", maps)
+                    except Exception as e:
+                        print(f"{self.provider.name} coin listesi alınamadı:", e)
+                        maps = ({}, {})
+                        self.id_maps.set("maps", maps, ttl=ID_MAP_RETRY)
+        return maps
+
+    # Coin listesini önceden yükler (tarama başında paralel çağrılır)
+    def warm_up(self):
+        self._get_id_maps()
+
+    # Uzun ad verilmişse önce adla, sonra sembolle eşleştirilir; maps verilmezse önbellekten alınır
+    def resolve(self, token_code, token_name=None, maps=None):
+        by_symbol, by_name = maps or self._get_id_maps()
+        if token_name:
+            return by_name.get(token_name.lower()) or by_symbol.get(token_code.lower())
+        return by_symbol.get(token_code.lower()) or by_name.get(token_code.lower())
+
+    # tokens: token kodu ya da (kod, uzun ad) çiftlerinden oluşan liste; sonuç aynı sırada döner
+    def fetch_market_data(self, tokens):
+        with stage(f"enrich:{self.provider.name}"):
+            return self._fetch_market_data(tokens)
+
+    def _fetch_market_data(self, tokens):
+        maps = self._get_id_maps()
+        coin_ids = [self.resolve(*t, maps=maps) if isinstance(t, tuple) else self.resolve(t, maps=maps)
+                    for t in tokens]
+        missing = sorted({c for c in coin_ids if c and self.market_data.get(c) is None})
+        for start in range(0, len(missing), self.provider.batch_size):
+            batch = missing[start:start + self.provider.batch_size]
+            try:
+                fetched = self.provider.fetch_batch(self.session, batch)
+            except Exception as e:
+                print(f"{self.provider.name} verileri alınamadı:", e)
+                continue
+            for coin_id in batch:
+                self.market_data.set(coin_id, fetched.get(coin_id, empty_market_data()))
+        return [(self.market_data.get(c) if c else None) or empty_market_data() for c in coin_ids]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+# Sağlayıcı HOCALAR_ENRICH_PROVIDER ortam değişkeniyle değiştirilebilir
+def get_enrichment_client(default="defillama"):
+    name = os.environ.get("HOCALAR_ENRICH_PROVIDER", default).lower()
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = EnrichmentClient(PROVIDERS[name]())
+        return _clients[name]
+
+
+# Testlerde ya da kayıt/oynatma için hazır bir istemci kaydedilebilir
+def register_enrichment_client(name, client):
+    with _clients_lock:
+        _clients[name] = client
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import ccxt
+from requests.adapters import HTTPAdapter
+
+from hocalar_fetch import WEIGHT_LIMIT_PER_MINUTE, RateLimitedExchange
+from hocalar_metrics import cache_event
+from hocalar_store import DEFAULT_STORE_PATH
+
+# === Ayarlar ===
+# Borsa seçimi: HOCALAR_EXCHANGE ortam değişkeni > yapılandırma dosyasındaki "default" > binanceus.
+# Yapılandırma dosyası (isteğe bağlı), örnek:
+#   {"default": "binance",
+#    "exchanges": {"binance": {"params": {"options": {"defaultType": "spot"}}, "weight_limit": 6000}}}
+EXCHANGE_CONFIG_PATH = os.environ.get("HOCALAR_EXCHANGE_CONFIG", "hocalar_exchanges.json")
+MARKETS_CACHE_DIR = os.path.join(os.path.dirname(DEFAULT_STORE_PATH), "markets")
+MARKETS_TTL = 6 * 3600
+POOL_MAXSIZE = 32  # Eşzamanlı indirme sayısından büyük olmalı, yoksa bağlantılar atılıp yeniden açılır
+
+
+def load_exchange_config(path=EXCHANGE_CONFIG_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def default_exchange_id():
+    return os.environ.get("HOCALAR_EXCHANGE") or load_exchange_config().get("default", "binanceus")
+
+
+# === Piyasa Bilgisi Disk Önbelleği ===
+# load_markets yüzlerce KB indirir; soğuk başlangıçta TTL dolmadıysa diskten set_markets ile yüklenir.
+def _markets_path(exchange_id):
+    return os.path.join(MARKETS_CACHE_DIR, f"{exchange_id}.json")
+
+
+def read_cached_markets(exchange_id, ttl=MARKETS_TTL):
+    path = _markets_path(exchange_id)
+    if not os.path.exists(path) or time.time() - os.path.getmtime(path) > ttl:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"{path} okunamadı: {e}")
+        return None
+
+
+def write_cached_markets(exchange_id, markets, currencies):
+    os.makedirs(MARKETS_CACHE_DIR, exist_ok=True)
+    path = _markets_path(exchange_id)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"markets": markets, "currencies": currencies}, f, default=str)
+    os.replace(tmp, path)
+
+
+def ensure_markets(exchange, ttl=MARKETS_TTL):
+    if exchange.markets:
+        return exchange.markets
+    cached = read_cached_markets(exchange.id, ttl)
+    cache_event("markets", cached is not None)
+    if cached is not None:
+        return exchange.set_markets(cached["markets"], cached.get("currencies"))
+    markets = exchange.load_markets()
+    try:
+        write_cached_markets(exchange.id, markets, exchange.currencies)
+    except (OSError, TypeError) as e:
+        print(f"{exchange.id} piyasa bilgisi kaydedilemedi: {e}")
+    return markets
+
+
+# === Borsa Kaydı ===
+# Süreç boyunca borsa başına tek ccxt istemcisi (ve onun tek HTTP oturumu) kullanılır.
+_exchanges = {}
+_exchanges_lock = threading.Lock()
+
+
+# wrap: ccxt istemcisini hız sınırlayıcıdan önce saran isteğe bağlı fonksiyon (ör. yanıt kaydı)
+def create_exchange(exchange_id, config=None, wrap=None):
+    settings = (config if config is not None else load_exchange_config()).get("exchanges", {}).get(exchange_id, {})
+    client = getattr(ccxt, exchange_id)(dict(settings.get("params", {})))
+    session = getattr(client, "session", None)
+    if session is not None:
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    if wrap is not None:
+        client = wrap(client)
+    return RateLimitedExchange(client, weight_limit=settings.get("weight_limit", WEIGHT_LIMIT_PER_MINUTE), owned=True)
+
+
+# Testlerde ya da kayıt/oynatma için hazır bir istemci kaydedilebilir
+def register_exchange(exchange_id, exchange):
+    with _exchanges_lock:
+        _exchanges[exchange_id] = exchange
+
+
+def get_shared_exchange(exchange_id=None):
+    exchange_id = exchange_id or default_exchange_id()
+    with _exchanges_lock:
+        if exchange_id not in _exchanges:
+            _exchanges[exchange_id] = create_exchange(exchange_id)
+        exchange = _exchanges[exchange_id]
+        ensure_markets(exchange)
+    return exchange
+
+
+# Çevrimdışı okumalarda depo anahtarı olarak sadece borsa kimliği gerekir: kayıtlı istemci varsa o, yoksa
+# kimliği taşıyan bir yer tutucu döner. Piyasa bilgisi yüklenmez (işlem havuzundaki süreçler ağa çıkmaz).
+def offline_exchange(exchange_id=None):
+    exchange_id = exchange_id or default_exchange_id()
+    with _exchanges_lock:
+        exchange = _exchanges.get(exchange_id)
+    return exchange if exchange is not None else SimpleNamespace(id=exchange_id)
+
+
+def reset_exchanges():
+    with _exchanges_lock:
+        _exchanges.clear()
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+import xlsxwriter
+
+from hocalar_metrics import cache_event
+
+# === Ayarlar ===
+EXPORT_CACHE_SIZE = 16
+CONSTANT_MEMORY_CELLS = 200_000  # bu kadar hücreden büyük tablolar satır satır, sabit bellekle yazılır
+EXPORT_FORMATS = {
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    try:
+        pd.io.parquet.get_engine("auto")
+    except ImportError:
+        return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet"]
+    return list(EXPORT_FORMATS)
+
+
+# === Tablo Özeti ===
+# Sütun adları, tipler ve satır değerlerinden hash; aynı içerik her yeniden çalıştırmada aynı özeti verir
+def frame_digest(df):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    except TypeError:
+        digest.update(df.to_csv(index=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# === Excel ===
+# Küçük tablolar pandas ile yazılır. Büyükler xlsxwriter constant_memory modunda satır satır yazılır:
+# her satır diske aktarılıp bellekten atılır (pandas hücreleri sütun sütun yazdığı için bu modda kullanılamaz).
+def write_excel(df, target, sheet_name="Sheet1"):
+    if df.size <= CONSTANT_MEMORY_CELLS:
+        with pd.ExcelWriter(target, engine="xlsxwriter") as writer:
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+        return
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "default_date_format": "yyyy-mm-dd"})
+    worksheet = workbook.add_worksheet(sheet_name)
+    header = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header)
+    values = df.astype(object).where(df.notna(), None)
+    for r, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(r, 0, row)
+    workbook.close()
+
+
+def _to_bytes(df, fmt, sheet_name):
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    output = BytesIO()
+    if fmt == "xlsx":
+        write_excel(df, output, sheet_name)
+    elif fmt == "parquet":
+        df.to_parquet(output, index=False)
+    else:
+        raise ValueError(f"Bilinmeyen indirme biçimi: {fmt}")
+    return output.getvalue()
+
+
+# === İndirme Baytları Önbelleği ===
+# Anahtar (tablo özeti, biçim, sayfa adı); panolar dosyayı sadece istenince üretir, aynı tablo için
+# yeniden çalıştırmalarda baytlar buradan gelir.
+_exports = OrderedDict()
+_exports_lock = threading.Lock()
+
+
+def export_bytes(df, fmt="xlsx", sheet_name="Sheet1", digest=None):
+    key = (digest or frame_digest(df), fmt, sheet_name)
+    with _exports_lock:
+        cached = _exports.get(key)
+        if cached is not None:
+            _exports.move_to_end(key)
+    cache_event("export", cached is not None)
+    if cached is not None:
+        return cached
+    data = _to_bytes(df, fmt, sheet_name)
+    with _exports_lock:
+        _exports[key] = data
+        while len(_exports) > EXPORT_CACHE_SIZE:
+            _exports.popitem(last=False)
+    return data
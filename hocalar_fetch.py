@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ccxt
+
+from hocalar_metrics import bind, count, stage
+
+# === Ayarlar ===
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+WEIGHT_LIMIT_PER_MINUTE = 1200
+# Binance istek ağırlıkları: exchangeInfo sabit, klines limit'e göre artar (limit verilmezse 500)
+MARKETS_WEIGHT = 20
+KLINE_WEIGHTS = ((99, 1), (499, 2), (1000, 5))
+KLINE_MAX_WEIGHT = 10
+
+
+def kline_weight(limit=None):
+    limit = limit or 500
+    return next((weight for upper, weight in KLINE_WEIGHTS if limit <= upper), KLINE_MAX_WEIGHT)
+
+
+# === Token Bucket Hız Sınırlayıcı ===
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    # Borsa "yavaşla" dediğinde (429/418 ya da ağırlık sınırı) tüm iş parçacıkları birlikte bekler.
+    def pause(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+# === Hız Sınırlı Borsa Sarmalayıcı ===
+# owned=True: istemci bu sarmalayıcı için oluşturulmuştur (create_exchange, install_replay). ccxt'nin kendi
+# beklemesi kapatılır, yerine kova kullanılır; yanıt başlıkları ve boyutu istemcinin on_rest_response
+# kancasıyla isteği yapan iş parçacığına yazılır, paylaşılan last_response_headers okunmaz. Başkasının da
+# kullandığı bir istemci sarılırsa (owned=False) ayarlarına dokunulmaz; istek ve başlık okuma tek kilit
+# altında yapılır, başka iş parçacığının yanıtı okunamaz.
+class RateLimitedExchange:
+    def __init__(self, exchange, weight_limit=WEIGHT_LIMIT_PER_MINUTE, owned=False):
+        self._exchange = exchange
+        self.owned = owned
+        self.bucket = TokenBucket(1000.0 / max(exchange.rateLimit, 1))
+        self.weight_limit = weight_limit
+        self._response = threading.local()
+        self._lock = None
+        if owned:
+            exchange.enableRateLimit = False
+            on_rest_response = exchange.on_rest_response
+
+            def record_response(code, reason, url, method, headers, body, *args):
+                body = on_rest_response(code, reason, url, method, headers, body, *args)
+                self._response.headers, self._response.size = headers or {}, len(body or "")
+                return body
+
+            exchange.on_rest_response = record_response
+        else:
+            self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self._exchange, name)
+
+    # owned değilse kilit altında, isteğin hemen ardından çağrılır
+    def _read_response(self):
+        if not self.owned:
+            self._response.headers = self._exchange.last_response_headers or {}
+            self._response.size = len(getattr(self._exchange, 'last_http_response', None) or "")
+        return self._response.headers, self._response.size
+
+    def _check_weight(self, headers):
+        used = headers.get(WEIGHT_HEADER) or headers.get(WEIGHT_HEADER.upper())
+        if used and int(used) >= 0.9 * self.weight_limit:
+            self.bucket.pause(60 - time.time() % 60)
+
+    def _retry_after(self, headers, attempt):
+        retry_after = headers.get('Retry-After') or headers.get('retry-after')
+        if retry_after:
+            return float(retry_after)
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (1 + random.random() * 0.25)
+
+    def _request(self, method, *args, **kwargs):
+        self._response.headers, self._response.size = {}, 0
+        try:
+            return getattr(self._exchange, method)(*args, **kwargs)
+        finally:
+            self._read_response()
+
+    # weight: bu isteğin borsa ağırlığı (kovadan o kadar jeton alınır)
+    def call(self, method, weight, *args, **kwargs):
+        for attempt in range(MAX_RETRIES + 1):
+            with stage("ccxt:rate_limit_wait"):
+                self.bucket.acquire(weight)
+            try:
+                with stage(f"ccxt:{method}"):
+                    if self._lock is None:
+                        result = self._request(method, *args, **kwargs)
+                    else:
+                        with self._lock:
+                            result = self._request(method, *args, **kwargs)
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                # ccxt, Binance'in 429 yanıtını RateLimitExceeded, 418 yanıtını DDoSProtection olarak fırlatır
+                count("retries:ccxt")
+                if attempt == MAX_RETRIES:
+                    raise
+                self.bucket.pause(self._retry_after(self._response.headers, attempt))
+                continue
+            finally:
+                count("requests:ccxt")
+            self._check_weight(self._response.headers)
+            count("bytes:ccxt", self._response.size)
+            return result
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        return self.call('fetch_ohlcv', kline_weight(limit), symbol, timeframe, since, limit, params or {})
+
+    def load_markets(self, *args, **kwargs):
+        return self.call('load_markets', MARKETS_WEIGHT, *args, **kwargs)
+
+
+# === Eşzamanlı Çalıştırıcı ===
+# progress(done, total, item) çağıran iş parçacığında çalışır, bu yüzden Streamlit öğelerini güncelleyebilir.
+def run_concurrently(items, worker, max_workers=8, progress=None):
+    items = list(items)
+    results = [None] * len(items)
+    worker = bind(worker)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(worker, item): i for i, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                print(f"{items[i]} işlenirken hata: {e}")
+            if progress:
+                progress(done, len(items), items[i])
+    return results
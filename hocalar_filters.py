@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+# === Aralık Filtre Motoru ===
+# Veri her yüklendiğinde bir kez kurulur: sayısal sütunlar float NumPy dizilerine çevrilir, slider
+# sınırları tüm veriden hesaplanır (diğer filtrelerden ve sıralarından bağımsızdır) ve sütun başına
+# "boş değil" dizisi tutulur. Filtrelemede tüm aktif aralıklar tek bir maskede birleştirilir; satır ve
+# sütun seçimi sonda tek bir iloc ile yapılır, ara DataFrame kopyası oluşmaz.
+# Tam aralıkta bırakılan slider pasiftir: o sütunda boş (NaN) olan satırlar elenmez.
+class RangeFilter:
+    def __init__(self, df):
+        self.positions = {col: i for i, col in enumerate(df.columns)}
+        self.values = {}
+        self.bounds = {}
+        self.present = {}
+        for col in df.columns:
+            series = df[col]
+            self.present[col] = series.notna().to_numpy()
+            if not pd.api.types.is_numeric_dtype(series):
+                continue
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            finite = values[np.isfinite(values)]
+            if len(finite) and finite.min() != finite.max():
+                self.values[col] = values
+                self.bounds[col] = (float(finite.min()), float(finite.max()))
+
+    # ranges: {sütun: (alt, üst)}; None dönerse tüm satırlar geçer
+    def mask(self, ranges):
+        mask = None
+        for col, (low, high) in ranges.items():
+            if (low, high) == self.bounds[col]:
+                continue
+            values = self.values[col]
+            hit = values >= low
+            hit &= values <= high
+            if mask is None:
+                mask = hit
+            else:
+                mask &= hit
+        return mask
+
+    # Seçilen sütunlardan filtre sonrası tamamen boş kalanlar atılır (drop_empty)
+    def apply(self, df, ranges, columns, drop_empty=True):
+        mask = self.mask(ranges)
+        rows = slice(None) if mask is None else np.flatnonzero(mask)
+        if drop_empty:
+            columns = [col for col in columns if self.present[col][rows].any()]
+        return df.iloc[rows, [self.positions[col] for col in columns]]
@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+
+from hocalar_metrics import timed
+
+
+# === AVWAP Hesapla ===
+# Eski başlangıç kuralı korunur: çapa verinin başlangıcından önceyse ikinci mumdan başlanır.
+@timed("calculate_avwap")
+def calculate_avwap(df, anchor_date="2020-03-18"):
+    ts = _timestamps_ms(df)
+    anchor_ts = _anchor_ms(anchor_date)
+    start = int(np.searchsorted(ts, anchor_ts)) if len(ts) and ts[0] <= anchor_ts else 1
+    tp = _typical_price(df)[start:]
+    volume = _column(df, "volume")[start:]
+    if len(tp) == 0 or np.nansum(volume) == 0:
+        return None, None
+    avwap = np.nansum(tp * volume) / np.nansum(volume)
+    std = np.sqrt(np.nanmean((tp - avwap) ** 2)) if len(tp) > 1 else 0
+    return avwap, avwap + 4 * std
+
+
+# df: DataFrame ya da hocalar_candles.Candles görünümü (zaman damgaları zaten int64 epoch-ms)
+def _timestamps_ms(df):
+    ts = df["timestamp"]
+    if isinstance(ts, np.ndarray) and ts.dtype == np.int64:
+        return ts
+    return np.asarray(ts, dtype="datetime64[ms]").astype(np.int64)
+
+
+def _column(df, name):
+    return np.asarray(df[name], dtype=float)
+
+
+def _typical_price(df):
+    return (_column(df, "high") + _column(df, "low") + _column(df, "close")) / 3
+
+
+def _anchor_ms(anchor):
+    return int(pd.Timestamp(anchor).value // 1_000_000)
+
+
+# === Çapa Çözümle ===
+# 'ath': en yüksek high, 'cycle_low': en düşük low, 'listing': ilk mum; diğer değerler tarih olarak
+# yorumlanır: o tarihteki ya da sonraki mum; tarih verinin başlangıcından önceyse calculate_avwap gibi ikinci mum.
+def resolve_anchor_index(anchor, ts, high, low):
+    if anchor == "ath":
+        return int(np.nanargmax(high))
+    if anchor == "cycle_low":
+        return int(np.nanargmin(low))
+    if anchor == "listing":
+        return 0
+    anchor_ts = _anchor_ms(anchor)
+    return int(np.searchsorted(ts, anchor_ts)) if ts[0] <= anchor_ts else 1
+
+
+# === Çoklu Çapa AVWAP ===
+# Tüm çapalar tek kümülatif toplam geçişiyle hesaplanır; çapa başına DataFrame kopyası yoktur.
+# σ, tp'nin AVWAP etrafındaki (ağırlıksız) sapmasıdır; koşullandırma için tp ortalamadan kaydırılır.
+@timed("calculate_avwaps")
+def calculate_avwaps(df, anchors=("2020-03-18",), sigmas=(1, 2, 3, 4), with_series=False):
+    ts = _timestamps_ms(df)
+    high, low = _column(df, "high"), _column(df, "low")
+    tp = (high + low + _column(df, "close")) / 3
+    volume = _column(df, "volume")
+    valid_tp = ~np.isnan(tp)
+    shift = np.nanmean(tp) if valid_tp.any() else 0.0
+    x = np.where(valid_tp, tp - shift, 0.0)
+
+    def cumulative(values):
+        return np.concatenate(([0.0], np.cumsum(values)))
+
+    c_pv = cumulative(np.nan_to_num(tp * volume))
+    c_v = cumulative(np.nan_to_num(volume))
+    c_k = cumulative(valid_tp)
+    c_x = cumulative(x)
+    c_x2 = cumulative(x * x)
+
+    summary, series = [], {}
+    n = len(ts)
+    for anchor in anchors:
+        a = resolve_anchor_index(anchor, ts, high, low) if n else 0
+        ends = np.arange(a + 1, n + 1) if with_series else np.array([n])
+        ends = ends[ends > a]
+        sum_v = c_v[ends] - c_v[a]
+        k = c_k[ends] - c_k[a]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avwap = np.where(sum_v != 0, (c_pv[ends] - c_pv[a]) / sum_v, np.nan)
+            centred = avwap - shift
+            var = (c_x2[ends] - c_x2[a] - 2 * centred * (c_x[ends] - c_x[a])) / k + centred ** 2
+            std = np.where(ends - a > 1, np.sqrt(np.maximum(var, 0)), 0.0)
+        row = {"anchor": str(anchor), "start": pd.Timestamp(ts[a], unit="ms") if a < n else pd.NaT,
+               "avwap": avwap[-1] if len(ends) else np.nan, "std": std[-1] if len(ends) else np.nan}
+        for s in sigmas:
+            row[f"+{s}σ"] = row["avwap"] + s * row["std"]
+            row[f"-{s}σ"] = row["avwap"] - s * row["std"]
+        summary.append(row)
+        if with_series:
+            frame = {"timestamp": pd.to_datetime(ts[ends - 1], unit="ms"), "avwap": avwap}
+            for s in sigmas:
+                frame[f"+{s}σ"] = avwap + s * std
+                frame[f"-{s}σ"] = avwap - s * std
+            series[str(anchor)] = pd.DataFrame(frame)
+    summary = pd.DataFrame(summary).set_index("anchor") if summary else pd.DataFrame()
+    return (summary, series) if with_series else summary
+
+
+# === Volume Profile Izgarası ===
+# Eski döngüdeki adım ve kenar hesabının birebir aynısı; sonuçların değişmemesi için korunmalı.
+def _profile_grid(high, low, tick_size, row_param):
+    price_range = high - low
+    price_step = max(tick_size, round((price_range / row_param) / tick_size) * tick_size)
+    bin_edges = np.arange(low, high + price_step, price_step)
+    return price_step, bin_edges
+
+
+# Boş girdide np.bincount tamsayı dizi döndürür; hacim toplamları her zaman float olmalı.
+def _bincount(idx, weights, length):
+    return np.bincount(idx, weights=weights, minlength=length).astype(float, copy=False)
+
+
+# === Volume Profile Çekirdeği ===
+# base/step/n_bins/offset satır başına dizilerdir; böylece birden çok sembol tek bincount ile toplanır.
+# mode='close': hacmin tamamı kapanışın düştüğü kutuya yazılır (eski davranış).
+# mode='range': hacim mumun high-low aralığına, kutularla kesişim oranında eşit dağıtılır.
+def _bin_volume(close, high, low, volume, base, step, n_bins, offset, total_bins, mode='close'):
+    if mode == 'close':
+        idx = np.floor_divide(close - base, step)
+        valid = ~(np.isnan(close) | np.isnan(volume)) & (idx >= 0) & (idx < n_bins)
+        return _bincount((offset + idx)[valid].astype(np.intp), volume[valid], total_bins)
+    if mode != 'range':
+        raise ValueError(f"Bilinmeyen volume profile modu: {mode}")
+
+    a = np.clip((low - base) / step, 0, n_bins)
+    b = np.clip((high - base) / step, 0, n_bins)
+    point = np.floor_divide(close - base, step)
+    has_range = ~(np.isnan(a) | np.isnan(b)) & (b > a)
+    valid_point = ~has_range & ~(np.isnan(close) | np.isnan(volume)) & (point >= 0) & (point < n_bins)
+    has_range &= ~np.isnan(volume)
+    out = _bincount((offset + point)[valid_point].astype(np.intp), volume[valid_point], total_bins)
+
+    a, b, v = a[has_range], b[has_range], volume[has_range]
+    n, off = np.broadcast_to(n_bins, has_range.shape)[has_range], np.broadcast_to(offset, has_range.shape)[has_range]
+    ka = np.minimum(np.floor(a), n - 1).astype(np.intp)
+    kb = np.minimum(np.floor(b), n - 1).astype(np.intp)
+    density = v / (b - a)
+    same = ka == kb
+    out += _bincount(off[same] + ka[same], v[same], total_bins)
+    split = ~same
+    ka, kb, a, b, density, off = ka[split], kb[split], a[split], b[split], density[split], off[split]
+    out += _bincount(off + ka, density * (ka + 1 - a), total_bins)
+    out += _bincount(off + kb, density * (b - kb), total_bins)
+    # Aradaki tam kutular fark dizisi ile tek geçişte doldurulur
+    diff = _bincount(off + ka + 1, density, total_bins + 1)
+    diff -= _bincount(off + kb, density, total_bins + 1)
+    out += np.cumsum(diff)[:total_bins]
+    return out
+
+
+def _ohlcv_arrays(df):
+    return tuple(_column(df, col) for col in ('close', 'high', 'low', 'volume'))
+
+
+# === Volume Profile Hesapla ===
+@timed("compute_volume_profile")
+def compute_volume_profile(df, tick_size=0.01, row_param=50, mode='close'):
+    if df.empty:
+        return pd.DataFrame({'price_level': [], 'total_volume': []})
+    close, high, low, volume = _ohlcv_arrays(df)
+    price_step, bin_edges = _profile_grid(np.nanmax(high), np.nanmin(low), tick_size, row_param)
+    n_bins = max(len(bin_edges) - 1, 0)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    volume_sum = _bin_volume(close, high, low, volume, bin_edges[0], price_step, n_bins, 0, n_bins, mode)
+    return pd.DataFrame({'price_level': bin_centers, 'total_volume': volume_sum})
+
+
+# === Parçalı (düşük zaman dilimi) Volume Profile ===
+# chunks: (ts, open, high, low, close, volume) sütunlu 2B diziler (CandleStore.iter_chunks). Izgara
+# önceden bilinen ATH ve pencere dibinden kurulur, her parça aynı kutulara eklenir; bellek kullanımı
+# parça boyutuyla sınırlıdır. Izgara dışına düşen mumlar atlanır.
+@timed("accumulate_volume_profile")
+def accumulate_volume_profile(chunks, high, low, tick_size=0.01, row_param=50, mode='range'):
+    price_step, bin_edges = _profile_grid(high, low, tick_size, row_param)
+    n_bins = max(len(bin_edges) - 1, 0)
+    volume_sum = np.zeros(n_bins)
+    for chunk in chunks:
+        if n_bins:
+            volume_sum += _bin_volume(chunk[:, 4], chunk[:, 2], chunk[:, 3], chunk[:, 5], bin_edges[0], price_step,
+                                      n_bins, 0, n_bins, mode)
+    return pd.DataFrame({'price_level': (bin_edges[:-1] + bin_edges[1:]) / 2, 'total_volume': volume_sum})
+
+
+# === Çoklu Sembol Volume Profile ===
+# frames: {sembol: DataFrame ya da Candles}; CandleSet.items() de verilebilir. Tüm mumlar birleştirilip tek bincount çağrısıyla kutulanır.
+@timed("compute_volume_profiles")
+def compute_volume_profiles(frames, tick_size=0.01, row_param=50, mode='close'):
+    frames = {symbol: df for symbol, df in dict(frames).items() if not df.empty}
+    if not frames:
+        return {}
+    grids, row_counts = {}, []
+    total_bins = 0
+    for symbol, df in frames.items():
+        price_step, bin_edges = _profile_grid(np.nanmax(_column(df, 'high')), np.nanmin(_column(df, 'low')),
+                                              tick_size, row_param)
+        n_bins = max(len(bin_edges) - 1, 0)
+        grids[symbol] = (price_step, bin_edges, n_bins, total_bins)
+        total_bins += n_bins
+        row_counts.append(len(df))
+
+    arrays = zip(*(_ohlcv_arrays(df) for df in frames.values()))
+    close, high, low, volume = (np.concatenate(columns) for columns in arrays)
+    per_symbol = np.array([(g[1][0], g[0], g[2], g[3]) for g in grids.values()])
+    base, step, n_bins, offset = (np.repeat(per_symbol[:, i], row_counts) for i in range(4))
+    volume_sum = _bin_volume(close, high, low, volume, base, step, n_bins, offset.astype(np.intp),
+                             total_bins, mode)
+
+    profiles = {}
+    for symbol, (price_step, bin_edges, n, start) in grids.items():
+        profiles[symbol] = pd.DataFrame({'price_level': (bin_edges[:-1] + bin_edges[1:]) / 2,
+                                         'total_volume': volume_sum[start:start + n]})
+    return profiles
+
+
+# === Value Area: En Dar Pencere (iki işaretçi) ===
+# Fiyat sırasına göre, hacmi hedefe ulaşan en dar [VAL, VAH] aralığı. Önek toplamları ile
+# her başlangıç için bitiş işaretçisi sadece ileri gider; toplam O(n).
+def _value_area_window(prices, volumes, target):
+    prefix = np.concatenate(([0.0], np.cumsum(volumes))).tolist()
+    prices = prices.tolist()
+    n = len(prices)
+    min_range_width = float('inf')
+    val = vah = None
+    j = 0
+    for i in range(n):
+        j = max(j, i)
+        while j < n and prefix[j + 1] - prefix[i] < target:
+            j += 1
+        if j == n:
+            break
+        width = prices[j] - prices[i]
+        if width < min_range_width:
+            min_range_width = width
+            val, vah = prices[i], prices[j]
+    return val, vah
+
+
+# === Value Area: POC'tan Dışa Genişleme (klasik yöntem) ===
+# POC kutusundan başlanır; her adımda üstteki ve alttaki ikişer kutunun hacmi karşılaştırılır
+# ve büyük olan taraf alana eklenir.
+def _value_area_poc(prices, volumes, target):
+    volumes = volumes.tolist()
+    n = len(volumes)
+    lo = hi = int(np.argmax(volumes))
+    covered = volumes[lo]
+    while covered < target and (lo > 0 or hi < n - 1):
+        up = volumes[hi + 1:hi + 3]
+        down = volumes[max(lo - 2, 0):lo]
+        if sum(up) >= sum(down) and up:
+            hi += len(up)
+            covered += sum(up)
+        else:
+            lo -= len(down)
+            covered += sum(down)
+    return float(prices[lo]), float(prices[hi])
+
+
+def value_area_bounds(prices, volumes, value_area_pct=0.7, method='window'):
+    prices = np.asarray(prices, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    if method == 'window':
+        keep = volumes > 0
+        prices, volumes = prices[keep], volumes[keep]
+    elif method != 'poc':
+        raise ValueError(f"Bilinmeyen value area yöntemi: {method}")
+    if len(prices) == 0 or not (volumes > 0).any():
+        return None, None
+    order = np.argsort(prices, kind='stable')
+    prices, volumes = prices[order], volumes[order]
+    target = volumes.sum() * value_area_pct
+    if method == 'window':
+        return _value_area_window(prices, volumes, target)
+    return _value_area_poc(prices, volumes, target)
+
+
+# === VAL VAH Hesapla ===
+@timed("calculate_value_area_range")
+def calculate_value_area_range(vp_df, value_area_pct=0.7, method='window'):
+    return value_area_bounds(vp_df['price_level'].to_numpy(), vp_df['total_volume'].to_numpy(),
+                             value_area_pct, method)
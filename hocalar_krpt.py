@@ -1,187 +1,55 @@
-import ccxt
-import pandas as pd
-import numpy as np
-import time
-import requests
-from datetime import datetime
-import pytz
 import streamlit as st
-from io import BytesIO
+from dataclasses import replace
+from hocalar_dashboard import export_section, performance_section, scan_section, scan_sidebar
+from hocalar_export import frame_digest
+from hocalar_metrics import stage
+from hocalar_replay import install_from_env
+from hocalar_screener import RuleSet, Screener, load_rule_sets, save_rule_set
 
 # === Streamlit Ayarları ===
+# HOCALAR_REPLAY ayarlıysa borsa, API ve sayfa istekleri ağsız oynatılır
+install_from_env()
 st.set_page_config(layout="wide")
 st.sidebar.title("Filtre Ayarları")
 st.title("Hocalar Kripto Tarama - AVWAP & Volume Profile")
-
-# === Binance Sembollerini Al ===
-@st.cache_data
-def fetch_binance_usdt_symbols():
-    exchange = ccxt.binanceus()
-    markets = exchange.load_markets()
-    symbols_info = []
-    for symbol, market in markets.items():
-        if symbol.endswith('/USDT') and market['active']:
-            symbols_info.append((symbol, market['info'].get('baseAsset', symbol.split('/')[0])))
-    return symbols_info
-
-# === OHLCV Verisi Al ===
-def fetch_ohlcv_data_binance(symbol):
-    exchange = ccxt.binanceus()
-    since = exchange.parse8601('2019-01-01T00:00:00Z')
-    ohlcv = []
-    while since < exchange.milliseconds():
-        try:
-            data = exchange.fetch_ohlcv(symbol, timeframe='1d', since=since, limit=1000)
-            if not data:
-                break
-            ohlcv.extend(data)
-            since = data[-1][0] + 86400000
-            time.sleep(1.5)
-        except Exception as e:
-            print(f"{symbol} verisi alinirken hata: {e}")
-            break
-
-    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    for col in ['open', 'high', 'low', 'close', 'volume']:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    return df
-
-# === AVWAP Hesapla ===
-def calculate_avwap(df, anchor_date="2020-03-18"):
-    avwap_anchor_date = pd.to_datetime(anchor_date)
-    start_point = avwap_anchor_date if df["timestamp"].min() <= avwap_anchor_date else df["timestamp"].iloc[1]
-    avwap_df = df[df["timestamp"] >= start_point].copy()
-    if avwap_df.empty or avwap_df["volume"].sum() == 0:
-        return None, None
-    tp = (avwap_df["high"] + avwap_df["low"] + avwap_df["close"]) / 3
-    volume = avwap_df["volume"]
-    avwap = (tp * volume).sum() / volume.sum()
-    std = np.sqrt(np.mean((tp - avwap) ** 2)) if len(tp) > 1 else 0
-    return avwap, avwap + 4 * std
-
-# === Volume Profile Hesapla ===
-def compute_volume_profile(df, tick_size=0.01, row_param=50):
-    high, low = df['high'].max(), df['low'].min()
-    price_range = high - low
-    price_step = max(tick_size, round((price_range / row_param) / tick_size) * tick_size)
-    bin_edges = np.arange(low, high + price_step, price_step)
-    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
-    volume_sum = np.zeros(len(bin_centers))
-    for i in range(len(df)):
-        price = df['close'].iloc[i]
-        volume = df['volume'].iloc[i]
-        if pd.isna(price) or pd.isna(volume):
-            continue
-        bin_idx = int((price - low) // price_step)
-        if 0 <= bin_idx < len(bin_centers):
-            volume_sum[bin_idx] += volume
-    return pd.DataFrame({'price_level': bin_centers, 'total_volume': volume_sum})
-
-# === VAL VAH Hesapla ===
-def calculate_value_area_range(vp_df, value_area_pct=0.7):
-    df = vp_df[vp_df['total_volume'] > 0].sort_values(by='price_level').reset_index(drop=True)
-    total_volume = df['total_volume'].sum()
-    target_volume = total_volume * value_area_pct
-    min_range_width = float('inf')
-    val = vah = None
-    for i in range(len(df)):
-        cum_volume = 0
-        for j in range(i, len(df)):
-            cum_volume += df.at[j, 'total_volume']
-            if cum_volume >= target_volume:
-                width = df.at[j, 'price_level'] - df.at[i, 'price_level']
-                if width < min_range_width:
-                    min_range_width = width
-                    val, vah = df.at[i, 'price_level'], df.at[j, 'price_level']
-                break
-    return val, vah
-
-# === DefiLlama Coin ID Eşlemesi ===
-def get_defillama_coins():
-    url = "https://coins.llama.fi/list"
-    try:
-        response = requests.get(url)
-        data = response.json()
-        return {item['symbol'].upper(): item['id'] for item in data['coins'].values()}
-    except Exception as e:
-        print("DefiLlama coin listesi alınamadı:", e)
-        return {}
-
-# === DefiLlama Verilerini Al ===
-def get_defillama_data(coin_id):
-    url = f"https://coins.llama.fi/prices/current/{coin_id}"
-    try:
-        response = requests.get(url)
-        data = response.json()
-        coin_data = list(data['coins'].values())[0]
-        return {
-            "Market Cap": coin_data.get("mc"),
-            "Circulating Supply": coin_data.get("circulatingSupply"),
-            "Total Supply": coin_data.get("totalSupply"),
-            "TVL": coin_data.get("tvl")
-        }
-    except:
-        return {"Market Cap": None, "Circulating Supply": None, "Total Supply": None, "TVL": None}
-
-# === Analiz Fonksiyonu ===
-def analyze_symbol(symbol, token_name, coin_id_map):
-    df = fetch_ohlcv_data_binance(symbol)
-    if df.empty or len(df) < 100:
-        return None
-    ath_price = df["high"].max()
-    ath_date = df[df["high"] == ath_price]["timestamp"].iloc[0]
-    latest_close = df["close"].iloc[-1]
-    latest_date = df["timestamp"].iloc[-1]
-    pct_down = ((ath_price - latest_close) / ath_price * 100)
-    day_diff = (latest_date - ath_date).days
-    avwap, avwap_upper = calculate_avwap(df)
-    pct_from_avwap = ((latest_close - avwap) / avwap * 100) if avwap else None
-    pct_from_upper = ((latest_close - avwap_upper) / avwap_upper * 100) if avwap_upper else None
-    vp_df = df[df["timestamp"] >= ath_date]
-    vp = compute_volume_profile(vp_df)
-    poc = vp.loc[vp['total_volume'].idxmax(), 'price_level'] if not vp.empty else None
-    val, vah = calculate_value_area_range(vp) if not vp.empty else (None, None)
-    pct_from_poc = ((latest_close - poc) / poc * 100) if poc else None
-    pct_from_val = ((latest_close - val) / val * 100) if val else None
-    vp_band_width = ((vah - val) / (ath_price - val) * 100) if val and vah else None
-    defillama_data = get_defillama_data(coin_id_map.get(token_name.upper(), ""))
-
-    return [symbol, token_name, round(ath_price, 4), ath_date.date(), round(latest_close, 4), latest_date.date(),
-            round(pct_down, 2), day_diff, round(avwap, 4), round(avwap_upper, 4),
-            round(pct_from_avwap, 2) if pct_from_avwap else None,
-            round(pct_from_upper, 2) if pct_from_upper else None,
-            round(poc, 4) if poc else None, round(val, 4) if val else None, round(vah, 4) if vah else None,
-            round(pct_from_poc, 2) if pct_from_poc else None, round(pct_from_val, 2) if pct_from_val else None,
-            round(vp_band_width, 2) if vp_band_width else None,
-            defillama_data["Market Cap"], defillama_data["Circulating Supply"],
-            defillama_data["Total Supply"], defillama_data["TVL"]]
+params, use_snapshot = scan_sidebar(provider='defillama')
 
 # === Ana İşlem ===
 st.info("Veriler Binance Global ve DefiLlama'dan çekiliyor, lütfen bekleyin...")
-symbols_info = fetch_binance_usdt_symbols()
-coin_id_map = get_defillama_coins()
-results = []
-for symbol, token_name in symbols_info[:20]:  # ilk 20 ile sınırlandı
-    row = analyze_symbol(symbol, token_name, coin_id_map)
-    if row:
-        results.append(row)
-
-columns = ["Symbol", "Token Adı", "ATH", "ATH Tarihi", "Son Fiyat", "Son Tarih", "ATH'den % Fark", "Gün Sayısı",
-           "AVWAP", "AVWAP +4σ", "% Fark AVWAP", "% Fark +4σ",
-           "POC", "VAL", "VAH", "% Fark POC", "% Fark VAL", "VP Genişliği (%)",
-           "Market Cap", "Circulating Supply", "Total Supply", "TVL"]
-df_result = pd.DataFrame(results, columns=columns)
+df_result, table = scan_section(params, use_snapshot)
 
 # === Filtreleme ===
-st.dataframe(df_result, use_container_width=True)
-
-# === Excel İndirme ===
-def convert_df_to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False)
-    return output.getvalue()
-
-excel_data = convert_df_to_excel(df_result)
-st.download_button("Excel olarak indir", data=excel_data, file_name="kripto_analiz.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+# Kurallar bir kez derlenip sonuç tablosu üzerinde vektörel maskelerle uygulanır (hocalar_screener);
+# kural değişikliği yeniden tarama gerektirmez. Tablo özeti aynı kaldıkça sütun dizileri yeniden kurulmaz.
+@st.cache_resource(max_entries=4)
+def build_screener(digest, _df):
+    return Screener(_df)
+
+rule_sets = load_rule_sets()
+st.sidebar.header("Tarama Kuralları")
+screen_name = st.sidebar.selectbox("Kayıtlı kural seti", ["(yok)"] + list(rule_sets))
+preset = rule_sets.get(screen_name, RuleSet(screen_name))
+rules_text = st.sidebar.text_area("Kurallar (her satır bir koşul, hepsi sağlanmalı)", value="\n".join(preset.rules),
+                                  key=f"rules_{screen_name}", help="Örn: % Fark VAL < 10 and Market Cap > 50M")
+score_text = st.sidebar.text_input("Sıralama skoru", value=preset.score, key=f"score_{screen_name}",
+                                   help="Örn: ATH'den % Fark - % Fark VAL")
+ascending = st.sidebar.checkbox("Küçükten büyüğe sırala", value=preset.ascending, key=f"ascending_{screen_name}")
+rule_set = RuleSet(screen_name, tuple(line.strip() for line in rules_text.splitlines() if line.strip()),
+                   score_text.strip(), ascending, preset.limit)
+df_view = df_result
+if rule_set.rules or rule_set.score:
+    try:
+        with stage("screen"):
+            df_view = build_screener(frame_digest(df_result), df_result).apply(rule_set)
+        st.caption(f"{len(df_view)}/{len(df_result)} sembol kurallara uyuyor")
+    except ValueError as e:
+        st.sidebar.error(str(e))
+new_name = st.sidebar.text_input("Kural seti adı", value="" if screen_name == "(yok)" else screen_name)
+if st.sidebar.button("Kural setini kaydet") and new_name.strip():
+    save_rule_set(replace(rule_set, name=new_name.strip()))
+    st.sidebar.success(f"Kaydedildi: {new_name.strip()}")
+table.dataframe(df_view, use_container_width=True)
+
+# === İndirme ve Performans ===
+export_section(df_view)
+performance_section()
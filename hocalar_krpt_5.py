@@ -1,32 +1,27 @@
 import streamlit as st
+import time
 import pandas as pd
-from io import BytesIO
+from hocalar_export import EXPORT_FORMATS, available_formats, export_bytes, frame_digest
+from hocalar_filters import RangeFilter
+from hocalar_replay import install_from_env
+from hocalar_sheets import get_sheet_loader
 
+# HOCALAR_REPLAY ayarlıysa borsa, API ve sayfa istekleri ağsız oynatılır
+install_from_env()
 st.set_page_config(layout="wide")
 st.title("Hocalar Kripto")
 
-# === Convert Google Sheets URLs to export CSV format ===
-#def convert_edit_url_to_csv(url):
-#    return url.split("/edit")[0] + "/export?format=csv"
-def convert_edit_url_to_csv(url):
-    base = url.split("/edit")[0]
-    if "gid=" in url:
-        # mevcut gid parametresini koru
-        gid = url.split("gid=")[-1].split("&")[0]
-        return f"{base}/export?format=csv&gid={gid}"
-    return f"{base}/export?format=csv"
-
 # === Load Data from Google Sheets ===
-@st.cache_data(ttl=0)
-def load_google_sheet(url):
+# Sayfalar süreç genelinde önbelleklenir (hocalar_sheets): TTL dolunca eski veri gösterilirken arka planda
+# yenilenir, filtre etkileşimleri ağa çıkmaz. Ayrıştırılmış tablolar paylaşılır; değiştirilmeden kullanılır.
+sheet_loader = get_sheet_loader()
+
+def load_google_sheet(url, refresh=False):
     try:
-        csv_url = convert_edit_url_to_csv(url)
-        df = pd.read_csv(csv_url)
-        df.columns = df.columns.str.strip()
-        return df
+        return sheet_loader.refresh(url) if refresh else sheet_loader.get(url)
     except Exception as e:
         st.error(f"Error loading sheet: {e}")
-        return pd.DataFrame()
+        return None
 
 # === URLs ===
 #url1 = "https://docs.google.com/spreadsheets/d/1lPP3BdIVMGAijVp5OWUbE-rGO-PRrUCT9AtKblg_lTs/edit?usp=drivesdk"
@@ -37,25 +32,31 @@ url2 = "https://docs.google.com/spreadsheets/d/14CRP9oM7852jl3X7C8KeXKjvwZsR9sXt
 # === Load Sheets ===
 # Guncel sayfa GID’sini elle belirle
 #df1 = load_google_sheet(convert_edit_url_to_csv(url1, gid="0"))  # örnek GID değeri (ilk sekme genelde "0" olur)
-df1 = load_google_sheet(url1)
-df2 = load_google_sheet(url2)
-
-# === Normalize Token Names for Merge ===
-#if "Token" in df1.columns:
-#    df1["Token"] = df1["Token"].str.replace("/USDT", "", regex=False).str.strip()
-
-# === Normalize Token Names for Merge ===
-if "Token" in df1.columns:
-    df1["Token"] = df1["Token"].str.replace("/USDT", "", regex=False).str.strip().str.upper()
-
-# === Normalize Sembol in df2 ===
-if "Sembol" in df2.columns:
-    df2["Sembol"] = df2["Sembol"].str.strip().str.upper()    
+refresh_now = st.sidebar.button("🔄 Şimdi yenile")
+sheet1 = load_google_sheet(url1, refresh=refresh_now)
+sheet2 = load_google_sheet(url2, refresh=refresh_now)
+for sheet in (sheet1, sheet2):
+    if sheet is not None and sheet.error:
+        st.warning(f"Sayfa yenilenemedi, son alınan veri gösteriliyor: {sheet.error}")
+loaded = [sheet.fetched_at for sheet in (sheet1, sheet2) if sheet is not None]
+if loaded:
+    st.sidebar.caption(f"Son kontrol: {time.strftime('%H:%M:%S', time.localtime(min(loaded)))}"
+                       f" (her {sheet_loader.ttl} sn)")
 
 # === Merge using Token <-> Sembol ===
+# Sonuç sayfa içerik özetleriyle önbelleklenir; sayfalar değişmediyse birleştirme tekrarlanmaz
+@st.cache_resource(max_entries=4)
+def merge_sheets(digest1, digest2, _df1, _df2):
+    # === Normalize Token Names for Merge ===
+    df1 = _df1.assign(Token=_df1["Token"].str.replace("/USDT", "", regex=False).str.strip().str.upper())
+    # === Normalize Sembol in df2 ===
+    df2 = _df2.assign(Sembol=_df2["Sembol"].str.strip().str.upper())
+    return pd.merge(df1, df2, left_on="Token", right_on="Sembol", how="left", suffixes=("_df1", "_df2"))
+
+df1 = sheet1.frame if sheet1 is not None else pd.DataFrame()
+df2 = sheet2.frame if sheet2 is not None else pd.DataFrame()
 if "Token" in df1.columns and "Sembol" in df2.columns:
-    merged = pd.merge(df1, df2, left_on="Token", right_on="Sembol", how="left", suffixes=("_df1", "_df2"))
-
+    merged = merge_sheets(sheet1.digest, sheet2.digest, df1, df2)
 else:
     st.error("Required columns 'Token' and 'Sembol' not found in the sheets.")
     st.stop()
@@ -63,8 +64,12 @@ else:
 # === Sidebar: Column Selector ===
 st.sidebar.header("Filter Options")
 
-non_numeric_cols = [col for col in merged.columns if not pd.api.types.is_numeric_dtype(merged[col])]
-numeric_cols = [col for col in merged.columns if pd.api.types.is_numeric_dtype(merged[col])]
+# Filtre dizileri ve slider sınırları veri yüklemesi başına bir kez hazırlanır (hocalar_filters)
+@st.cache_resource(max_entries=4)
+def build_range_filter(digest1, digest2, _merged):
+    return RangeFilter(_merged)
+
+range_filter = build_range_filter(sheet1.digest, sheet2.digest, merged)
 
 # Column selection
 selected_columns = st.sidebar.multiselect(
@@ -73,43 +78,32 @@ selected_columns = st.sidebar.multiselect(
     default=merged.columns.tolist()
 )
 
-filtered_df = merged.copy()
-
 # Numeric slider filters
-for col in numeric_cols:
-    min_val = float(filtered_df[col].min())
-    max_val = float(filtered_df[col].max())
-    if pd.notna(min_val) and pd.notna(max_val) and min_val != max_val:
-        selected_range = st.sidebar.slider(
-            f"{col} range", min_val, max_val, (min_val, max_val)
-        )
-        filtered_df = filtered_df[(filtered_df[col] >= selected_range[0]) & (filtered_df[col] <= selected_range[1])]
+# Sınırlar tüm veriden gelir; tam aralıkta bırakılan slider filtre uygulamaz
+ranges = {}
+for col, (min_val, max_val) in range_filter.bounds.items():
+    ranges[col] = st.sidebar.slider(
+        f"{col} range", min_val, max_val, (min_val, max_val)
+    )
 
 # === Display Table ===
-# st.dataframe(filtered_df[selected_columns], use_container_width=True)
-# === Display Table ===
-
-# ➤ Seçilen kolonlardan tamamı boş olanları çıkar
-filtered_df = filtered_df[selected_columns].dropna(axis=1, how="all")
-
-# (İsteğe bağlı) Seçilen kolon listesini de güncelle
-#selected_columns = filtered_df.columns.tolist()
+# Tüm aralıklar tek maskede birleşir; satır ve kolon seçimi tek adımda yapılır,
+# seçilen kolonlardan tamamı boş olanlar çıkarılır
+filtered_df = range_filter.apply(merged, ranges, selected_columns)
 
 # Veri çerçevesini göster
 st.dataframe(filtered_df, use_container_width=True)
 
-# === Excel Export ===
-def convert_df_to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="MergedData")
-    return output.getvalue()
-
-#excel_data = convert_df_to_excel(filtered_df[selected_columns])
-excel_data = convert_df_to_excel(filtered_df)
-st.download_button(
-    label="📥 Excel Olarak İndir",
-    data=excel_data,
-    file_name="hocalar_kripto.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
+# === Export ===
+# Dosya sadece istenince üretilir; aynı tablo ve biçim için baytlar önbellekten gelir (hocalar_export)
+export_format = st.selectbox("Export format", available_formats(), format_func=lambda fmt: EXPORT_FORMATS[fmt][0])
+export_key = (frame_digest(filtered_df), export_format)
+if st.button("Dosyayı hazırla"):
+    st.session_state["export_key"] = export_key
+if st.session_state.get("export_key") == export_key:
+    st.download_button(
+        label=f"📥 {EXPORT_FORMATS[export_format][0]} Olarak İndir",
+        data=export_bytes(filtered_df, export_format, sheet_name="MergedData", digest=export_key[0]),
+        file_name=f"hocalar_kripto.{export_format}",
+        mime=EXPORT_FORMATS[export_format][1]
+    )
@@ -0,0 +1,194 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+# === Performans Ölçümleri ===
+# Aşama başına süre ve çağrı sayısı, sembol başına aşama süreleri ve sayaçlar (istek, bayt, yeniden
+# deneme, önbellek isabeti) tutulur. "Geçerli çalışma" bağlama özeldir (contextvars): start_run yenisini
+# çağıranın bağlamında başlatır, eşzamanlı Streamlit oturumları birbirinin ölçümlerine yazmaz. Çalışma dışında
+# ölçülenler süreç geneli varsayılan çalışmaya gider. İç içe aşamalar ayrı ayrı sayılır (analyze süresi fetch
+# süresini de içerir).
+METRICS_DIR = os.environ.get("HOCALAR_METRICS_DIR", os.path.join(".hocalar_cache", "metrics"))
+
+
+class Metrics:
+    def __init__(self, label="scan"):
+        self.label = label
+        self.started = time.time()
+        self.finished = None
+        self.stages = {}
+        self.symbols = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage, seconds, symbol=None):
+        with self._lock:
+            entry = self.stages.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            if symbol is not None:
+                per_symbol = self.symbols.setdefault(symbol, {})
+                per_symbol[stage] = per_symbol.get(stage, 0.0) + seconds
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # Alt süreçte ölçülen bir çalışmanın snapshot()'ı bu çalışmaya eklenir (işlem havuzu)
+    def merge(self, snapshot):
+        with self._lock:
+            for name, entry in snapshot["stages"].items():
+                totals = self.stages.setdefault(name, [0, 0.0])
+                totals[0] += entry["calls"]
+                totals[1] += entry["seconds"]
+            for symbol, stages in snapshot["symbols"].items():
+                per_symbol = self.symbols.setdefault(symbol, {})
+                for name, seconds in stages.items():
+                    per_symbol[name] = per_symbol.get(name, 0.0) + seconds
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    # Bitmiş çalışmanın duvar süresi sabitlenir; bitmemişse şimdiye kadarki süre raporlanır
+    def finish(self):
+        self.finished = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "label": self.label,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "wall_seconds": round((self.finished or time.time()) - self.started, 3),
+                "stages": {name: {"calls": calls, "seconds": round(seconds, 6)}
+                           for name, (calls, seconds) in sorted(self.stages.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "cache_hit_ratio": self._cache_ratios_unlocked(),
+                "symbols": {symbol: {stage: round(seconds, 6) for stage, seconds in sorted(stages.items())}
+                            for symbol, stages in sorted(self.symbols.items())},
+            }
+
+    # cache_hit:<ad> / cache_miss:<ad> sayaçlarından isabet oranları (kilit altında çağrılır)
+    def _cache_ratios_unlocked(self):
+        names = {key.split(":", 1)[1] for key in self.counters if key.startswith(("cache_hit:", "cache_miss:"))}
+        ratios = {}
+        for name in sorted(names):
+            hits = self.counters.get(f"cache_hit:{name}", 0)
+            misses = self.counters.get(f"cache_miss:{name}", 0)
+            ratios[name] = round(hits / (hits + misses), 4) if hits + misses else None
+        return ratios
+
+
+_default = Metrics()
+_run = contextvars.ContextVar("hocalar_metrics_run", default=None)
+_local = threading.local()
+
+
+def current():
+    return _run.get() or _default
+
+
+def start_run(label="scan"):
+    metrics = Metrics(label)
+    _run.set(metrics)
+    return metrics
+
+
+# İş parçacığı havuzları çağıranın bağlamını devralmaz; havuza verilen fonksiyon bununla sarılınca
+# sarıldığı andaki çalışmaya yazar
+def bind(fn):
+    metrics = current()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _run.set(metrics)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _run.reset(token)
+    return wrapper
+
+
+def count(name, n=1):
+    current().count(name, n)
+
+
+def cache_event(name, hit):
+    current().count(f"cache_hit:{name}" if hit else f"cache_miss:{name}")
+
+
+# Aşama süresi; symbol verilirse iç içe tüm aşamalar o sembole yazılır (iş parçacığına özel)
+@contextmanager
+def stage(name, symbol=None):
+    previous = getattr(_local, "symbol", None)
+    if symbol is not None:
+        _local.symbol = symbol
+    metrics = current()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - start, getattr(_local, "symbol", None))
+        _local.symbol = previous
+
+
+def timed(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# === Ölçümlü HTTP Oturumu ===
+# requests.Session yerine geçer; GET başına süre, istek sayısı ve yanıt baytı sağlayıcı adıyla sayılır.
+class InstrumentedSession:
+    def __init__(self, session, name):
+        self.session = session
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(self.session, attr)
+
+    def get(self, *args, **kwargs):
+        with stage(f"http:{self.name}"):
+            response = self.session.get(*args, **kwargs)
+        count(f"requests:{self.name}")
+        count(f"bytes:{self.name}", len(response.content or b""))
+        return response
+
+
+# === JSON Günlüğü ===
+# Her çalışma kendi dosyasına yazılır (anahtarlar sıralı, çalışmalar arasında diff alınabilir);
+# aynı çalışma tekrar yazılırsa dosyası güncellenir.
+def write_log(metrics=None, directory=METRICS_DIR):
+    metrics = metrics or current()
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(metrics.started))
+    path = os.path.join(directory, f"{metrics.label}_{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metrics.snapshot(), f, indent=1, sort_keys=True, ensure_ascii=False)
+    return path
+
+
+# === Panel Tabloları ===
+# (aşamalar, sayaçlar, en yavaş semboller) DataFrame'leri; Streamlit "Performance" paneli için
+def metrics_tables(snapshot, top=10):
+    stages = pd.DataFrame([{"Aşama": name, "Çağrı": s["calls"], "Toplam (s)": round(s["seconds"], 3),
+                            "Ortalama (ms)": round(s["seconds"] / s["calls"] * 1000, 2) if s["calls"] else None}
+                           for name, s in snapshot["stages"].items()])
+    if not stages.empty:
+        stages = stages.sort_values("Toplam (s)", ascending=False)
+    counters = pd.DataFrame([{"Sayaç": name, "Değer": value} for name, value in snapshot["counters"].items()]
+                            + [{"Sayaç": f"isabet oranı:{name}", "Değer": ratio}
+                               for name, ratio in snapshot["cache_hit_ratio"].items()])
+    symbols = pd.DataFrame.from_dict(snapshot["symbols"], orient="index")
+    if "analyze" in symbols:
+        symbols = symbols.sort_values("analyze", ascending=False)
+    return stages, counters, symbols.head(top).round(3)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from hocalar_candles import CandleSet
+from hocalar_indicators import _anchor_ms, _bin_volume, _profile_grid, _timestamps_ms, value_area_bounds
+from hocalar_metrics import timed
+
+DAY_MS = 86_400_000
+
+
+# === Mumları Panele Diz ===
+# {sembol: DataFrame} -> sembol ve zamana göre sıralı tek uzun tablo (symbol sütunu kategorik)
+def stack_candles(frames, min_candles=0):
+    frames = {symbol: df for symbol, df in frames.items() if len(df) >= max(min_candles, 1)}
+    if not frames:
+        return pd.DataFrame(columns=['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    panel = pd.concat(frames, names=['symbol', None]).reset_index(level=0)
+    panel['symbol'] = pd.Categorical(panel['symbol'], categories=list(frames))
+    return panel.reset_index(drop=True)
+
+
+# (sembol adları, satır başına sembol numarası, ts, high, low, close, volume)
+def _panel_columns(panel):
+    if isinstance(panel, CandleSet):
+        return (panel.symbols, panel.codes(), panel.timestamp,
+                *(np.asarray(getattr(panel, col), dtype=float) for col in ('high', 'low', 'close', 'volume')))
+    return (panel['symbol'].cat.categories, panel['symbol'].cat.codes.to_numpy(), _timestamps_ms(panel),
+            *(panel[col].to_numpy(dtype=float) for col in ('high', 'low', 'close', 'volume')))
+
+
+# === Panel Göstergeleri ===
+# panel: stack_candles çıktısı ya da hocalar_candles.CandleSet
+# ATH/ATH tarihi, düşüş %, ATH'den gün, AVWAP (+4σ), POC/VAL/VAH ve % farklar tüm semboller için
+# gruplu NumPy işlemleriyle tek geçişte hesaplanır. AVWAP başlangıç kuralı calculate_avwap ile aynıdır.
+@timed("compute_panel_metrics")
+def compute_panel_metrics(panel, anchor_date="2020-03-18", row_param=50, tick_size=0.01, with_profile=True):
+    symbols, codes, ts, high, low, close, volume = _panel_columns(panel)
+    if len(codes) == 0:
+        return pd.DataFrame(index=pd.Index([], name='symbol'))
+    n_sym = len(symbols)
+    counts = np.bincount(codes, minlength=n_sym)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ends = starts + counts
+    position = np.arange(len(codes)) - starts[codes]
+
+    def group_sum(values, mask=None):
+        values = np.nan_to_num(values) if mask is None else np.where(mask, np.nan_to_num(values), 0.0)
+        return np.bincount(codes, weights=values, minlength=n_sym)
+
+    # ATH ve ilk görüldüğü satır
+    ath = np.full(n_sym, -np.inf)
+    np.maximum.at(ath, codes, np.where(np.isnan(high), -np.inf, high))
+    is_ath = high == ath[codes]
+    ath_idx = np.full(n_sym, len(codes))
+    np.minimum.at(ath_idx, codes[is_ath], np.flatnonzero(is_ath))
+    last_close = close[ends - 1]
+    last_ts = ts[ends - 1]
+    ath_ts = ts[np.minimum(ath_idx, len(codes) - 1)]
+
+    # AVWAP: çapa verinin başından önceyse ikinci mumdan başlanır
+    anchor_ts = _anchor_ms(anchor_date)
+    anchor_inside = ts[starts] <= anchor_ts
+    in_window = np.where(anchor_inside[codes], ts >= anchor_ts, position >= 1)
+    tp = (high + low + close) / 3
+    valid_tp = in_window & ~np.isnan(tp)
+    sum_v = group_sum(volume, in_window)
+    rows = np.bincount(codes, weights=in_window, minlength=n_sym)
+    k = np.bincount(codes, weights=valid_tp, minlength=n_sym)
+    # σ sembolün kendi ortalamasına göre kaydırılarak toplanır; tek bir panel ortalaması ucuz coinlerde
+    # (BTC ile SHIB aynı panelde) farkları yutar
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.where(k > 0, group_sum(tp, valid_tp) / k, 0.0)
+        x = tp - shift[codes]
+        avwap = np.where((rows > 0) & (sum_v != 0), group_sum(tp * volume, in_window) / sum_v, np.nan)
+        centred = avwap - shift
+        var = (group_sum(x * x, valid_tp) - 2 * centred * group_sum(x, valid_tp)) / k + centred ** 2
+        std = np.where(rows > 1, np.sqrt(np.maximum(var, 0)), 0.0)
+    avwap_upper = avwap + 4 * std
+
+    metrics = pd.DataFrame({
+        'ATH': ath,
+        'ATH Tarihi': pd.to_datetime(ath_ts, unit='ms'),
+        'Son Fiyat': last_close,
+        'Son Tarih': pd.to_datetime(last_ts, unit='ms'),
+        "ATH'den % Fark": (ath - last_close) / ath * 100,
+        'Gün Sayısı': (last_ts - ath_ts) // DAY_MS,
+        'AVWAP': avwap,
+        'AVWAP +4σ': avwap_upper,
+        '% Fark AVWAP': (last_close - avwap) / avwap * 100,
+        '% Fark +4σ': (last_close - avwap_upper) / avwap_upper * 100,
+    }, index=pd.Index(symbols, name='symbol'))
+    if with_profile:
+        poc, val, vah = _panel_profiles(codes, position, ath_idx - starts, ath, low, close, volume, n_sym,
+                                        tick_size, row_param)
+        metrics['POC'], metrics['VAL'], metrics['VAH'] = poc, val, vah
+        metrics['% Fark POC'] = (last_close - poc) / poc * 100
+        metrics['% Fark VAL'] = (last_close - val) / val * 100
+        metrics['VP Genişliği (%)'] = (vah - val) / (ath - val) * 100
+    return metrics
+
+
+# === ATH Sonrası Profiller (toplu) ===
+# Pencere dipleri gruplu alınır, tüm sembollerin kutuları tek bincount çağrısıyla doldurulur.
+def _panel_profiles(codes, position, ath_pos, ath, low, close, volume, n_sym, tick_size, row_param):
+    window = position >= ath_pos[codes]
+    window_low = pd.Series(low[window]).groupby(codes[window]).min().reindex(range(n_sym)).to_numpy()
+    grids, offset, total_bins = [], np.zeros(n_sym, dtype=np.intp), 0
+    for i in range(n_sym):
+        price_step, bin_edges = _profile_grid(ath[i], window_low[i], tick_size, row_param)
+        n_bins = max(len(bin_edges) - 1, 0)
+        grids.append((price_step, bin_edges, n_bins))
+        offset[i] = total_bins
+        total_bins += n_bins
+    base = np.array([g[1][0] for g in grids])
+    step = np.array([g[0] for g in grids])
+    n_bins = np.array([g[2] for g in grids])
+    c = codes[window]
+    volume_sum = _bin_volume(close[window], None, None, volume[window], base[c], step[c], n_bins[c], offset[c],
+                             total_bins)
+
+    poc, val, vah = (np.full(n_sym, np.nan) for _ in range(3))
+    for i, (price_step, bin_edges, n) in enumerate(grids):
+        if n == 0:
+            continue
+        levels = (bin_edges[:-1] + bin_edges[1:]) / 2
+        bins = volume_sum[offset[i]:offset[i] + n]
+        poc[i] = levels[np.argmax(bins)]
+        bounds = value_area_bounds(levels, bins)
+        val[i], vah[i] = (np.nan, np.nan) if bounds[0] is None else bounds
+    return poc, val, vah
@@ -0,0 +1,55 @@
+import ccxt
+import numpy as np
+import pandas as pd
+
+from hocalar_indicators import _timestamps_ms
+
+# === Mum Yeniden Örnekleme ===
+# Kaba zaman dilimleri (1w, 1M, 3d, 4h...) depodaki ince mumlardan türetilir; tekrar indirme gerekmez.
+# Kova başlangıçları borsa mumlarıyla aynıdır: UTC epoch hizalı, haftalar Pazartesi, aylar ayın 1'i.
+DAY_MS = 86_400_000
+WEEK_OFFSET_MS = 4 * DAY_MS  # 1970-01-01 Perşembe; ilk Pazartesi 4 gün sonra
+
+
+def timeframe_ms(timeframe):
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+def bucket_start(ts, timeframe):
+    unit, amount = timeframe[-1], int(timeframe[:-1])
+    if unit in ('M', 'y'):
+        calendar = 'datetime64[M]' if unit == 'M' else 'datetime64[Y]'
+        periods = ts.astype('datetime64[ms]').astype(calendar).astype(np.int64) // amount * amount
+        return periods.astype(calendar).astype('datetime64[ms]').astype(np.int64)
+    step = timeframe_ms(timeframe)
+    offset = WEEK_OFFSET_MS if unit == 'w' else 0
+    return (ts - offset) // step * step + offset
+
+
+# source mumları target kovalarına tam bölünüyorsa türetilebilir (ör. 1h -> 4h, 1d -> 1w/1M)
+def can_resample(source, target):
+    source_ms = timeframe_ms(source)
+    if target[-1] in ('M', 'y'):
+        return source_ms <= DAY_MS and DAY_MS % source_ms == 0
+    target_ms = timeframe_ms(target)
+    return source_ms < target_ms and target_ms % source_ms == 0
+
+
+# open: kovanın ilk mumu, close: son mumu, high/low: NaN'ları atlayan max/min, volume: toplam.
+# Son kova henüz kapanmamış olabilir; borsadaki açık mum gibi tabloya dahil edilir.
+def resample_ohlcv(df, timeframe):
+    if df.empty:
+        return df
+    ts = _timestamps_ms(df)
+    bucket = bucket_start(ts, timeframe)
+    starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+    ends = np.concatenate((starts[1:], [len(ts)])) - 1
+    column = {col: df[col].to_numpy(dtype=float) for col in ('open', 'high', 'low', 'close', 'volume')}
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(bucket[starts], unit='ms'),
+        'open': column['open'][starts],
+        'high': np.fmax.reduceat(column['high'], starts),
+        'low': np.fmin.reduceat(column['low'], starts),
+        'close': column['close'][ends],
+        'volume': np.add.reduceat(np.nan_to_num(column['volume']), starts),
+    })
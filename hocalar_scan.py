@@ -0,0 +1,670 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+
+import ccxt
+import numpy as np
+import pandas as pd
+
+from hocalar_archive import archived_candles
+from hocalar_candles import CandleSet
+from hocalar_enrich import ENRICH_COLUMNS, empty_market_data, get_enrichment_client
+from hocalar_exchange import default_exchange_id, get_shared_exchange, offline_exchange
+from hocalar_fetch import run_concurrently
+from hocalar_indicators import (accumulate_volume_profile, calculate_avwap, calculate_avwaps, calculate_value_area_range,
+                                compute_volume_profile)
+from hocalar_metrics import Metrics, bind, cache_event, current, stage, start_run, write_log
+from hocalar_panel import compute_panel_metrics
+from hocalar_resample import can_resample, resample_ohlcv
+from hocalar_shared import attach_candles, share_candles
+from hocalar_state import dumps_state, loads_state, update_indicator_state
+from hocalar_store import get_store, sync_ohlcv, sync_store
+
+# === Ayarlar ===
+MIN_CANDLES = 100
+SCAN_CACHE_SIZE = 8
+SNAPSHOT_DIR = os.environ.get("HOCALAR_SNAPSHOT_DIR", "snapshots")
+INTRADAY_PROFILE_MODE = 'range'  # düşük zaman diliminde hacim mumun high-low aralığına dağıtılır
+# forkserver: alt süreçler modülleri önceden yüklemiş temiz bir süreçten çatallanır (iş parçacıklı
+# ana süreçten fork edilmez)
+PROCESS_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+METRIC_COLUMNS = ["ATH", "ATH Tarihi", "Son Fiyat", "Son Tarih", "ATH'den % Fark", "Gün Sayısı",
+                  "AVWAP", "AVWAP +4σ", "% Fark AVWAP", "% Fark +4σ",
+                  "POC", "VAL", "VAH", "% Fark POC", "% Fark VAL", "VP Genişliği (%)"]
+SCAN_COLUMNS = ["Symbol", "Token Adı"] + METRIC_COLUMNS + ENRICH_COLUMNS
+LONG_NAME_COLUMNS = ["Symbol", "Token", "Token Adı"] + METRIC_COLUMNS + ENRICH_COLUMNS
+
+
+# === Tarama Parametreleri ===
+# Önbellek anahtarının parçasıdır; sonucu etkilemeyen alanlar compare=False ile anahtar dışında tutulur.
+@dataclass(frozen=True)
+class ScanParams:
+    exchange_id: str = field(default_factory=default_exchange_id)
+    quote: str = 'USDT'
+    timeframe: str = '1d'
+    symbols: tuple = ()
+    max_symbols: int = 0
+    anchor_date: str = "2020-03-18"
+    extra_anchors: tuple = ()
+    extra_timeframes: tuple = ()
+    profile_timeframe: str = ''  # boş: profil ana zaman dilimi mumlarından; örn. '1h': saatlik mumlardan
+    row_param: int = 50
+    provider: str = 'defillama'
+    long_names: bool = False
+    offline: bool = False
+    panel: bool = False
+    max_workers: int = field(default=8, compare=False)
+    processes: int = field(default=0, compare=False)  # > 1: göstergeler işlem havuzunda hesaplanır
+
+
+# === USDT Paritelerini Al ===
+def fetch_usdt_symbols(exchange_id=None, quote='USDT'):
+    markets = get_shared_exchange(exchange_id).markets
+    symbols_info = []
+    for symbol, market in markets.items():
+        if symbol.endswith(f'/{quote}') and market['active']:
+            info = market['info']
+            symbols_info.append((symbol, info.get('baseAsset', symbol.split('/')[0]), info.get('baseAssetName')))
+    return symbols_info
+
+
+# Açık sembol listesi verilmişse sadece onlar, yoksa ilk max_symbols parite taranır
+def select_universe(symbols_info, params):
+    if params.symbols:
+        wanted = set(params.symbols)
+        symbols_info = [item for item in symbols_info if item[0] in wanted]
+    return symbols_info[:params.max_symbols] if params.max_symbols else symbols_info
+
+
+# === OHLCV Verisi Al ===
+# Arşiv (hocalar_archive) varsa geçmiş bellek eşlemeli dosyalardan okunur; depodan sadece arşivin son
+# mumundan sonrası yüklenir. Arşivin son mumu kapanmamış olabileceği için depodaki sürümü tercih edilir.
+def fetch_ohlcv_data(symbol, exchange_id=None, timeframe='1d', offline=False):
+    exchange = offline_exchange(exchange_id) if offline else get_shared_exchange(exchange_id)
+    archived = archived_candles(exchange.id, symbol, timeframe)
+    cache_event("archive", archived is not None and not archived.empty)
+    if archived is None or archived.empty:
+        return sync_ohlcv(exchange, symbol, timeframe=timeframe, offline=offline, pause=0)
+    tail = sync_ohlcv(exchange, symbol, timeframe=timeframe, offline=offline, pause=0,
+                      load_since=int(archived.timestamp[-1]))
+    if tail.empty:
+        return archived.to_frame()
+    head = archived[:int(np.searchsorted(archived.timestamp, _first_ms(tail)))]
+    return pd.concat([head.to_frame(), tail], ignore_index=True)
+
+
+def _first_ms(df):
+    return df["timestamp"].iloc[0].value // 1_000_000
+
+
+def _ath_ms(df):
+    return _first_ms(df.iloc[int(np.nanargmax(df["high"].to_numpy(dtype=float))):])
+
+
+# === Sembol Göstergelerini Hesapla ===
+# indicators verilirse (hocalar_state artımlı sonuçları) ATH, AVWAP ve profil yeniden hesaplanmaz
+def compute_symbol_metrics(df, anchor_date="2020-03-18", row_param=50, indicators=None):
+    if df.empty or len(df) < MIN_CANDLES:
+        return None
+    latest_close = df["close"].iloc[-1]
+    latest_date = df["timestamp"].iloc[-1]
+    if indicators is None:
+        ath_price = df["high"].max()
+        ath_date = df[df["high"] == ath_price]["timestamp"].iloc[0]
+        avwap, avwap_upper = calculate_avwap(df, anchor_date)
+        vp = compute_volume_profile(df[df["timestamp"] >= ath_date], row_param=row_param)
+    else:
+        ath_price, ath_date = indicators['ath_price'], indicators['ath_date']
+        avwap, avwap_upper, vp = indicators['avwap'], indicators['avwap_upper'], indicators['vp']
+    poc, val, vah = profile_levels(vp)
+    return format_metrics(ath_price, ath_date, latest_close, latest_date, avwap, avwap_upper, poc, val, vah)
+
+
+def profile_levels(vp):
+    if vp.empty:
+        return None, None, None
+    return (vp.loc[vp['total_volume'].idxmax(), 'price_level'], *calculate_value_area_range(vp))
+
+
+# === Düşük Zaman Dilimli Volume Profile ===
+# ATH sonrası profil params.profile_timeframe mumlarından, depodan parça parça okunarak kurulur.
+# Izgara ana zaman dilimindeki ATH ve pencere dibidir; böylece fiyat seviyeleri günlük profille aynıdır.
+# Bu mumlar sadece ATH'den itibaren indirilir. Hiç veri yoksa None döner (günlük profil kullanılır).
+def intraday_volume_profile(df, symbol, params):
+    high = df["high"].to_numpy(dtype=float)
+    ath_idx = int(np.nanargmax(high))
+    ath_ms = _first_ms(df.iloc[ath_idx:])
+    window_low = np.nanmin(df["low"].to_numpy(dtype=float)[ath_idx:])
+    exchange = offline_exchange(params.exchange_id) if params.offline else get_shared_exchange(params.exchange_id)
+    if not params.offline:
+        sync_store(exchange, symbol, params.profile_timeframe, since=ath_ms, pause=0)
+    chunks = get_store().iter_chunks(exchange.id, symbol, params.profile_timeframe, since=ath_ms)
+    vp = accumulate_volume_profile(chunks, high[ath_idx], window_low, row_param=params.row_param,
+                                   mode=INTRADAY_PROFILE_MODE)
+    return vp if vp['total_volume'].any() else None
+
+
+# === Gösterge Satırı ===
+# Seviyelerden % farklar hesaplanır ve tablo için yuvarlanır (sembol bazlı ve panel modu ortak)
+def format_metrics(ath_price, ath_date, latest_close, latest_date, avwap, avwap_upper, poc, val, vah):
+    pct_down = ((ath_price - latest_close) / ath_price * 100)
+    day_diff = (latest_date - ath_date).days
+    pct_from_avwap = ((latest_close - avwap) / avwap * 100) if avwap else None
+    pct_from_upper = ((latest_close - avwap_upper) / avwap_upper * 100) if avwap_upper else None
+    pct_from_poc = ((latest_close - poc) / poc * 100) if poc else None
+    pct_from_val = ((latest_close - val) / val * 100) if val else None
+    vp_band_width = ((vah - val) / (ath_price - val) * 100) if val and vah else None
+    return [round(ath_price, 4), ath_date.date(), round(latest_close, 4), latest_date.date(),
+            round(pct_down, 2), day_diff, round(avwap, 4) if avwap else None, round(avwap_upper, 4) if avwap_upper else None,
+            round(pct_from_avwap, 2) if pct_from_avwap else None, round(pct_from_upper, 2) if pct_from_upper else None,
+            round(poc, 4) if poc else None, round(val, 4) if val else None, round(vah, 4) if vah else None,
+            round(pct_from_poc, 2) if pct_from_poc else None, round(pct_from_val, 2) if pct_from_val else None,
+            round(vp_band_width, 2) if vp_band_width else None]
+
+
+# === Ek AVWAP Çapaları ===
+# 'ath', 'cycle_low', 'listing' ya da tarih; hepsi tek kümülatif geçişte hesaplanır
+def anchor_columns(extra_anchors):
+    return [col for anchor in extra_anchors for col in (f"AVWAP ({anchor})", f"% Fark AVWAP ({anchor})")]
+
+
+def compute_anchor_metrics(df, extra_anchors):
+    latest_close = df["close"].iloc[-1]
+    avwaps = calculate_avwaps(df, extra_anchors)["avwap"]
+    metrics = []
+    for anchor in extra_anchors:
+        value = avwaps[str(anchor)]
+        pct = (latest_close - value) / value * 100 if value else None
+        metrics += [round(value, 4) if pd.notna(value) else None, round(pct, 2) if pd.notna(pct) else None]
+    return metrics
+
+
+# === Ek Zaman Dilimleri ===
+# Ana zaman diliminden türetilebilenler (1d -> 1w, 1M) yeniden örneklenir; daha ince olanlar (4h)
+# kendi mumlarıyla ayrıca senkronize edilir.
+def timeframe_columns(extra_timeframes):
+    return [col for tf in extra_timeframes for col in (f"AVWAP ({tf})", f"% Fark AVWAP ({tf})", f"POC ({tf})",
+                                                        f"VAL ({tf})", f"VAH ({tf})", f"% Fark POC ({tf})")]
+
+
+def compute_timeframe_metrics(df, symbol, params):
+    latest_close = df["close"].iloc[-1]
+    metrics = []
+    for tf in params.extra_timeframes:
+        if can_resample(params.timeframe, tf):
+            frame = resample_ohlcv(df, tf)
+        else:
+            frame = fetch_ohlcv_data(symbol, params.exchange_id, tf, offline=params.offline)
+        avwap = poc = val = vah = None
+        if len(frame) > 1:
+            avwap, _ = calculate_avwap(frame, params.anchor_date)
+            ath_ts = frame["timestamp"].iloc[int(np.nanargmax(frame["high"].to_numpy(dtype=float)))]
+            vp = compute_volume_profile(frame[frame["timestamp"] >= ath_ts], row_param=params.row_param)
+            if not vp.empty:
+                poc = vp.loc[vp['total_volume'].idxmax(), 'price_level']
+                val, vah = calculate_value_area_range(vp)
+        pct_from_avwap = (latest_close - avwap) / avwap * 100 if avwap else None
+        pct_from_poc = (latest_close - poc) / poc * 100 if poc else None
+        metrics += [round(avwap, 4) if avwap else None, round(pct_from_avwap, 2) if pct_from_avwap else None,
+                    round(poc, 4) if poc else None, round(val, 4) if val else None, round(vah, 4) if vah else None,
+                    round(pct_from_poc, 2) if pct_from_poc else None]
+    return metrics
+
+
+# === Artımlı Göstergeler ===
+# Sembol ve çapa başına saklanan toplamlar güncellenir; sadece yeni kapanan mumlar işlenir.
+def incremental_indicators(df, symbol, params):
+    store = get_store()
+    state_key = f"{params.anchor_date}|{params.row_param}"
+    state = loads_state(store.load_state(params.exchange_id, symbol, params.timeframe, state_key))
+    indicators, state = update_indicator_state(df, state, params.anchor_date, row_param=params.row_param)
+    store.save_state(params.exchange_id, symbol, params.timeframe, state_key, dumps_state(state))
+    return indicators
+
+
+# === Sembol Analiz Et ===
+# status(symbol, durum) verilirse 'fetching' ve 'computing' aşamaları bildirilir (iş parçacığından çağrılır)
+def analyze_symbol(symbol, token_code, token_long, params, status=None):
+    with stage("analyze", symbol):
+        if status:
+            status(symbol, 'fetching')
+        with stage("fetch"):
+            df = fetch_ohlcv_data(symbol, params.exchange_id, params.timeframe, offline=params.offline)
+        if df.empty or len(df) < MIN_CANDLES:
+            return None
+        if status:
+            status(symbol, 'computing')
+        return compute_symbol_row(symbol, token_code, token_long, df, params)
+
+
+# Mumları alınmış bir sembolün tablo satırı (işlem havuzundaki süreçler de bunu çağırır)
+def compute_symbol_row(symbol, token_code, token_long, df, params):
+    with stage("indicators"):
+        indicators = incremental_indicators(df, symbol, params)
+    if params.profile_timeframe:
+        with stage("intraday_profile"):
+            vp = intraday_volume_profile(df, symbol, params)
+        if vp is not None:
+            indicators = dict(indicators, vp=vp)
+    metrics = compute_symbol_metrics(df, params.anchor_date, params.row_param, indicators=indicators)
+    if metrics is None:
+        return None
+    if params.extra_anchors:
+        with stage("extra_anchors"):
+            metrics += compute_anchor_metrics(df, params.extra_anchors)
+    if params.extra_timeframes:
+        with stage("extra_timeframes"):
+            metrics += compute_timeframe_metrics(df, symbol, params)
+    return [symbol, token_code, token_long] + metrics
+
+
+# === Sonuç Tablosu ===
+def build_result_frame(rows, market_data, long_names=False, extra_anchors=(), extra_timeframes=()):
+    results = [row + [data[col] for col in ENRICH_COLUMNS] for row, data in zip(rows, market_data)]
+    columns = (LONG_NAME_COLUMNS[:-len(ENRICH_COLUMNS)] + anchor_columns(extra_anchors)
+               + timeframe_columns(extra_timeframes) + ENRICH_COLUMNS)
+    df_result = pd.DataFrame(results, columns=columns)
+    # Piyasa verisi gelmeyince sütun tümüyle None kalır; yine de sayısal olmalı (filtreler ve screener)
+    df_result[ENRICH_COLUMNS] = df_result[ENRICH_COLUMNS].apply(pd.to_numeric, errors="coerce").astype(float)
+    if not long_names:
+        df_result = df_result.drop(columns="Token Adı").rename(columns={"Token": "Token Adı"})
+    return df_result
+
+
+# Tarama sürerken gösterilen ara tablo: piyasa verisi sütunları boş
+def partial_result_frame(rows, params):
+    return build_result_frame(rows, [empty_market_data() for _ in rows], params.long_names, params.extra_anchors,
+                              params.extra_timeframes)
+
+
+def enrich_rows(rows, params):
+    tokens = [(row[1], row[2]) if params.long_names else row[1] for row in rows]
+    return get_enrichment_client(params.provider).fetch_market_data(tokens)
+
+
+# === Panel Modu ===
+# Mumlar yine eşzamanlı çekilir; göstergeler ise tüm semboller tek panelde, gruplu işlemlerle hesaplanır.
+# Artımlı durum kullanılmaz, her taramada tüm geçmiş tek geçişte işlenir.
+PANEL_LEVELS = ["ATH", "ATH Tarihi", "Son Fiyat", "Son Tarih", "AVWAP", "AVWAP +4σ", "POC", "VAL", "VAH"]
+
+
+def _panel_fetch(item, params):
+    with stage("fetch", item[0]):
+        return fetch_ohlcv_data(item[0], params.exchange_id, params.timeframe, offline=params.offline)
+
+
+def analyze_panel(universe, params, progress=None):
+    frames = run_concurrently(universe, lambda item: _panel_fetch(item, params), max_workers=params.max_workers,
+                              progress=progress)
+    frames = {item[0]: df for item, df in zip(universe, frames) if df is not None}
+    metrics = compute_panel_metrics(CandleSet.from_frames(frames, MIN_CANDLES), params.anchor_date, params.row_param)
+    rows = []
+    for symbol, token_code, token_long in universe:
+        if symbol not in metrics.index:
+            continue
+        levels = [None if pd.isna(v) else v for v in metrics.loc[symbol, PANEL_LEVELS]]
+        if params.profile_timeframe:
+            with stage("intraday_profile", symbol):
+                vp = intraday_volume_profile(frames[symbol], symbol, params)
+            if vp is not None:
+                levels[-3:] = profile_levels(vp)
+        row = [symbol, token_code, token_long] + format_metrics(*levels)
+        if params.extra_anchors:
+            row += compute_anchor_metrics(frames[symbol], params.extra_anchors)
+        if params.extra_timeframes:
+            row += compute_timeframe_metrics(frames[symbol], symbol, params)
+        rows.append(row)
+    return rows
+
+
+# === İşlem Havuzu ===
+# Mumlar yereldeyken tarama CPU'ya bağlıdır (profil, değer alanı, pandas) ve GIL yüzünden tek çekirdekte
+# kalır. processes > 1 ise indirmeler yine iş parçacıklarıyla bu süreçte yapılır, mumlar tek paylaşımlı
+# bellek bloğuna (hocalar_shared, CandleSet düzeni) kopyalanır ve sembol hesapları alt süreçlere dağıtılır.
+# Alt süreçler ağa çıkmaz (offline), DataFrame pickle edilmez. Streamlit Cloud'da ya da havuz
+# açılamazsa hesaplar bu süreçte sırayla yapılır.
+def running_on_streamlit_cloud():
+    return os.path.isdir("/mount/src") or bool(os.environ.get("STREAMLIT_SHARING_MODE"))
+
+
+# HOCALAR_PROCESSES ortam değişkeni istenen sayıyı geçersiz kılar; 0 dönerse işlem havuzu kullanılmaz
+def resolve_processes(requested):
+    requested = int(os.environ.get("HOCALAR_PROCESSES") or requested or 0)
+    if requested <= 1 or running_on_streamlit_cloud():
+        return 0
+    processes = min(requested, os.cpu_count() or 1)
+    return processes if processes > 1 else 0
+
+
+# Hesap için gereken tüm mumlar (ana, profil ve türetilemeyen ek zaman dilimleri) önceden depoya alınır
+def prefetch_symbol(symbol, params):
+    with stage("fetch", symbol):
+        df = fetch_ohlcv_data(symbol, params.exchange_id, params.timeframe, offline=params.offline)
+        if params.offline or len(df) < MIN_CANDLES:
+            return df
+        exchange = get_shared_exchange(params.exchange_id)
+        if params.profile_timeframe:
+            sync_store(exchange, symbol, params.profile_timeframe, since=_ath_ms(df), pause=0)
+        for tf in params.extra_timeframes:
+            if not can_resample(params.timeframe, tf):
+                sync_store(exchange, symbol, tf, pause=0)
+    return df
+
+
+_worker_shm = None
+_worker_candles = None
+
+
+def _init_process_worker(handle):
+    global _worker_shm, _worker_candles
+    _worker_shm, _worker_candles = attach_candles(handle)
+
+
+# Alt süreçte çalışır; ölçümler satırla birlikte döner ve ana süreçteki çalışmaya eklenir
+def _compute_shared(item, params):
+    start_run(item[0])
+    with stage("analyze", item[0]):
+        row = compute_symbol_row(*item, _worker_candles[item[0]].to_frame(), params)
+    return row, current().snapshot()
+
+
+def _iter_pool_rows(items, candles, params, processes):
+    context = multiprocessing.get_context(PROCESS_START_METHOD)
+    if PROCESS_START_METHOD == 'forkserver':
+        context.set_forkserver_preload(['hocalar_scan'])
+    shm, handle = share_candles(candles)
+    pool = None
+    try:
+        pool = ProcessPoolExecutor(processes, mp_context=context, initializer=_init_process_worker,
+                                   initargs=(handle,))
+        futures = {pool.submit(_compute_shared, item, params): item for item in items}
+        for future in as_completed(futures):
+            try:
+                row, snapshot = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                yield futures[future], None, str(e)
+                continue
+            current().merge(snapshot)
+            yield futures[future], row, None
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+
+# ScanEvent akışı (iter_scan ile aynı durumlar); olaylar bitiş sırasıyla gelir
+def iter_process_scan(universe, params, processes):
+    total, done = len(universe), 0
+    frames, pending = {}, []
+    pool = ThreadPoolExecutor(max_workers=params.max_workers)
+    try:
+        pool.submit(bind(get_enrichment_client(params.provider).warm_up))
+        prefetch = bind(prefetch_symbol)
+        futures = {pool.submit(prefetch, item[0], params): item for item in universe}
+        yield ScanEvent('fetching', total=total)
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                done += 1
+                print(f"{item[0]} işlenirken hata: {e}")
+                yield ScanEvent('failed', item[0], done, total, error=str(e))
+                continue
+            if df.empty or len(df) < MIN_CANDLES:
+                done += 1
+                yield ScanEvent('skipped', item[0], done, total)
+                continue
+            frames[item[0]] = df
+            pending.append(item)
+            yield ScanEvent('computing', item[0], done, total)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # Her şey depoda olduğu için alt süreçler (ve yedek sıralı yol) çevrimdışı çalışır
+    worker_params = replace(params, offline=True)
+    remaining = {item[0]: item for item in pending}
+    try:
+        for item, row, error in _iter_pool_rows(pending, CandleSet.from_frames(frames), worker_params, processes):
+            del remaining[item[0]]
+            done += 1
+            if error:
+                print(f"{item[0]} işlenirken hata: {error}")
+                yield ScanEvent('failed', item[0], done, total, error=error)
+            else:
+                yield ScanEvent('computed' if row else 'skipped', item[0], done, total, row=row)
+    except (BrokenProcessPool, OSError) as e:
+        print(f"İşlem havuzu kullanılamadı, kalan {len(remaining)} sembol bu süreçte hesaplanıyor: {e}")
+    for symbol, item in remaining.items():
+        done += 1
+        try:
+            with stage("analyze", symbol):
+                row = compute_symbol_row(*item, frames[symbol], worker_params)
+        except Exception as e:
+            print(f"{symbol} işlenirken hata: {e}")
+            yield ScanEvent('failed', symbol, done, total, error=str(e))
+            continue
+        yield ScanEvent('computed' if row else 'skipped', symbol, done, total, row=row)
+
+
+# hocalar_cli.py için: satırlar sembol listesi sırasıyla döner
+def analyze_processes(universe, params, processes):
+    order = {item[0]: i for i, item in enumerate(universe)}
+    rows = [event.row for event in iter_process_scan(universe, params, processes) if event.row]
+    return sorted(rows, key=lambda row: order[row[0]])
+
+
+# === Akışlı Tarama ===
+# Her sembol bittiğinde bir olay üretilir; arayüz tabloyu tüm taramayı beklemeden günceller.
+# status: fetching, computing, computed (row dolu), skipped (az mum), failed (error dolu),
+# enriching ve finished (frame ve taramanın ölçümleri dolu, son olay).
+@dataclass
+class ScanEvent:
+    status: str
+    symbol: str = None
+    done: int = 0
+    total: int = 0
+    row: list = None
+    error: str = None
+    frame: pd.DataFrame = None
+    metrics: Metrics = None
+
+
+SCAN_STATUS_LABELS = {'fetching': "İndiriliyor", 'computing': "Hesaplanıyor", 'computed': "Tamam",
+                      'skipped': "Yetersiz veri", 'failed': "Hata"}
+
+
+# {sembol: son durum} -> "İndiriliyor: 3 · Tamam: 12" özeti
+def summarize_statuses(statuses):
+    counts = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+    return " · ".join(f"{label}: {counts[status]}" for status, label in SCAN_STATUS_LABELS.items() if status in counts)
+
+
+# Her tarama yeni bir ölçüm çalışması başlatır (hocalar_metrics); çalışma 'finished' olayıyla döner
+def iter_scan(params):
+    metrics = start_run(snapshot_name(params))
+    with stage("symbols"):
+        universe = select_universe(fetch_usdt_symbols(params.exchange_id, params.quote), params)
+    total = len(universe)
+    rows = []
+    processes = resolve_processes(params.processes)
+    if params.panel:
+        yield ScanEvent('fetching', total=total)
+        for done, row in enumerate(analyze_panel(universe, params), start=1):
+            rows.append(row)
+            yield ScanEvent('computed', row[0], done, total, row=row)
+    elif processes:
+        for event in iter_process_scan(universe, params, processes):
+            if event.row:
+                rows.append(event.row)
+            yield event
+    else:
+        events = queue.Queue()
+
+        def report(symbol, status):
+            events.put((symbol, status, None))
+
+        def worker(item):
+            try:
+                row = analyze_symbol(*item, params=params, status=report)
+                events.put((item[0], 'computed' if row else 'skipped', row))
+            except Exception as e:
+                events.put((item[0], 'failed', str(e)))
+
+        pool = ThreadPoolExecutor(max_workers=params.max_workers)
+        worker = bind(worker)
+        try:
+            # Coin listesi mumlarla paralel yüklenir, zenginleştirme aşaması beklemez
+            pool.submit(bind(get_enrichment_client(params.provider).warm_up))
+            for item in universe:
+                pool.submit(worker, item)
+            done = 0
+            while done < total:
+                symbol, status, payload = events.get()
+                if status in ('computed', 'skipped', 'failed'):
+                    done += 1
+                if status == 'computed':
+                    rows.append(payload)
+                    yield ScanEvent(status, symbol, done, total, row=payload)
+                elif status == 'failed':
+                    print(f"{symbol} işlenirken hata: {payload}")
+                    yield ScanEvent(status, symbol, done, total, error=payload)
+                else:
+                    yield ScanEvent(status, symbol, done, total)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    # Olaylar bitiş sırasıyla gelir; sonuç tablosu sembol listesinin sırasını korur
+    order = {item[0]: i for i, item in enumerate(universe)}
+    rows.sort(key=lambda row: order[row[0]])
+    yield ScanEvent('enriching', done=total, total=total)
+    with stage("enrich"):
+        market_data = enrich_rows(rows, params)
+    frame = build_result_frame(rows, market_data, params.long_names, params.extra_anchors, params.extra_timeframes)
+    metrics.finish()
+    yield ScanEvent('finished', done=total, total=total, frame=frame, metrics=metrics)
+
+
+# === Tam Tarama ===
+# sembol listesi -> mumlar -> göstergeler -> piyasa verileri -> sonuç tablosu
+# progress(done, total, symbol) her sembol bittiğinde çağrılır
+def run_scan(params, progress=None):
+    for event in iter_scan(params):
+        if progress and event.status in ('computed', 'skipped', 'failed'):
+            progress(event.done, event.total, event.symbol)
+    return event.frame
+
+
+# === Bellek İçi Tarama Önbelleği ===
+# Streamlit her etkileşimde betiği yeniden çalıştırır ama içe aktarılan modüller süreç boyunca yaşar;
+# bu yüzden sonuçlar burada tutulur. Veri sürümü, son kapanan mum periyodu ve elle yenileme sayacıdır.
+_scan_cache = OrderedDict()
+_scan_lock = threading.Lock()
+_generation = 0
+
+
+def data_version(params):
+    step_ms = ccxt.Exchange.parse_timeframe(params.timeframe) * 1000
+    return int(time.time() * 1000) // step_ms, _generation
+
+
+def invalidate_scan_cache():
+    global _generation
+    with _scan_lock:
+        _generation += 1
+        _scan_cache.clear()
+
+
+# Önbellekte varsa tek 'finished' olayı, yoksa akışlı tarama olayları üretilir; sonuç, taramanın ölçümleriyle
+# birlikte önbelleğe yazılır ve ölçüm günlüğü tarama başına bir kez yazılır. Önbellek isabetleri o taramanın
+# çalışmasına sayılır. Dönen tablo önbellekle paylaşılır; değiştirmeden önce kopyalanmalı.
+def iter_scan_result(params):
+    key = (params, data_version(params))
+    with _scan_lock:
+        cached = _scan_cache.get(key)
+        if cached is not None:
+            _scan_cache.move_to_end(key)
+    if cached is not None:
+        frame, metrics = cached
+        metrics.count("cache_hit:scan_result")
+        yield ScanEvent('finished', frame=frame, metrics=metrics)
+        return
+    for event in iter_scan(params):
+        if event.frame is not None:
+            event.metrics.count("cache_miss:scan_result")
+            write_log(event.metrics)
+            with _scan_lock:
+                _scan_cache[key] = (event.frame, event.metrics)
+                while len(_scan_cache) > SCAN_CACHE_SIZE:
+                    _scan_cache.popitem(last=False)
+        yield event
+
+
+def get_scan_result(params, progress=None):
+    for event in iter_scan_result(params):
+        if progress and event.status in ('computed', 'skipped', 'failed'):
+            progress(event.done, event.total, event.symbol)
+    return event.frame
+
+
+# === Hazır Tarama Çıktıları (snapshot) ===
+# hocalar_cli.py her parametre profili için <ad>_latest.parquet/csv ve parametreleri içeren <ad>_latest.json
+# yazar. Ad, sonucu etkileyen parametrelerin kısa özetini içerir; farklı profiller birbirinin dosyasını ve
+# kilidini kullanmaz. Panolar sadece parametreleri tam eşleşen çıktıyı okur.
+SNAPSHOT_FIELDS = ("exchange_id", "quote", "timeframe", "symbols", "max_symbols", "anchor_date", "extra_anchors",
+                   "extra_timeframes", "profile_timeframe", "row_param", "provider", "long_names")
+_snapshots = {}
+
+
+def snapshot_params(params):
+    values = {name: getattr(params, name) for name in SNAPSHOT_FIELDS}
+    return {name: list(value) if isinstance(value, tuple) else value for name, value in values.items()}
+
+
+def snapshot_name(params):
+    digest = hashlib.blake2b(json.dumps(snapshot_params(params), sort_keys=True).encode("utf-8"),
+                             digest_size=4).hexdigest()
+    return (f"{params.exchange_id}_{params.provider}_{params.timeframe}" + ("_long" if params.long_names else "")
+            + f"_{digest}")
+
+
+def _snapshot_matches(snapshot_dir, name, params):
+    try:
+        with open(os.path.join(snapshot_dir, f"{name}_latest.json"), encoding="utf-8") as f:
+            return json.load(f).get("params") == snapshot_params(params)
+    except (OSError, ValueError):
+        return False
+
+
+# (tablo, yazılma zamanı) ya da None
+def load_latest_snapshot(params, snapshot_dir=SNAPSHOT_DIR):
+    name = snapshot_name(params)
+    if not _snapshot_matches(snapshot_dir, name, params):
+        return None
+    for ext, reader in (("parquet", pd.read_parquet), ("csv", pd.read_csv)):
+        path = os.path.join(snapshot_dir, f"{name}_latest.{ext}")
+        if not os.path.exists(path):
+            continue
+        mtime = os.path.getmtime(path)
+        cached = _snapshots.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, reader(path))
+            except Exception as e:
+                print(f"{path} okunamadı: {e}")
+                continue
+            _snapshots[path] = cached
+        return cached[1], pd.Timestamp.fromtimestamp(mtime)
+    return None
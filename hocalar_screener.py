@@ -0,0 +1,313 @@
+import difflib
+import json
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# === Ayarlar ===
+SCREENS_PATH = os.environ.get("HOCALAR_SCREENS_PATH", os.path.join(".hocalar_cache", "screens.json"))
+SCORE_COLUMN = "Skor"
+SUFFIXES = {"k": 1e3, "m": 1e6, "b": 1e9, "t": 1e12}
+KEYWORDS = {"and": "and", "ve": "and", "or": "or", "veya": "or", "not": "not", "değil": "not"}
+FUNCTIONS = {"abs": (1, np.abs), "min": (2, np.fmin), "max": (2, np.fmax)}
+COMPARISONS = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+               "==": np.equal, "=": np.equal, "!=": np.not_equal}
+ARITHMETIC = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide}
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?(?:[eE][-+]?\d+)?([kKmMbBtT](?![\w]))?")
+WORD_PATTERN = re.compile(r"[^\W\d]\w*")
+OPERATOR_PATTERN = re.compile(r"<=|>=|==|!=|[<>=()+\-*/,]")
+
+
+# === Kural İfadeleri ===
+# Örnek: % Fark VAL < 10 and ATH'den % Fark > 80 and Market Cap > 50M
+# Sütun adları olduğu gibi yazılabilir (en uzun eşleşen sütun adı alınır) ya da `ters tırnak` içine alınır.
+# Sayılarda K/M/B/T sonekleri, and/or/not (ve/veya/değil), parantez, + - * /, abs/min/max ve metin
+# sütunları için 'tırnaklı' değerlerle ==/!= kullanılabilir. Boş (NaN) değerli satırlar karşılaştırmayı geçmez.
+def _tokenize(expression, columns):
+    ordered = sorted(columns, key=len, reverse=True)
+    tokens = []
+    i = 0
+    while i < len(expression):
+        if expression[i].isspace():
+            i += 1
+            continue
+        if expression[i] == "`":
+            end = expression.find("`", i + 1)
+            if end < 0:
+                raise ValueError(f"Kapanmayan ` (konum {i + 1})")
+            tokens.append(("column", expression[i + 1:end], i))
+            i = end + 1
+            continue
+        column = next((col for col in ordered if expression.startswith(col, i)
+                       and not (col[-1].isalnum() and expression[i + len(col):i + len(col) + 1].isalnum())), None)
+        if column is not None:
+            tokens.append(("column", column, i))
+            i += len(column)
+            continue
+        match = NUMBER_PATTERN.match(expression, i)
+        if match:
+            number = float(match.group(0).rstrip("kKmMbBtT"))
+            if match.group(1):
+                number *= SUFFIXES[match.group(1).lower()]
+            tokens.append(("number", number, i))
+            i = match.end()
+            continue
+        if expression[i] in "'\"":
+            end = expression.find(expression[i], i + 1)
+            if end < 0:
+                raise ValueError(f"Kapanmayan tırnak (konum {i + 1})")
+            tokens.append(("text", expression[i + 1:end], i))
+            i = end + 1
+            continue
+        match = WORD_PATTERN.match(expression, i)
+        if match and (match.group(0).lower() in KEYWORDS or match.group(0).lower() in FUNCTIONS):
+            word = match.group(0).lower()
+            tokens.append(("keyword", KEYWORDS[word], i) if word in KEYWORDS else ("function", word, i))
+            i = match.end()
+            continue
+        match = OPERATOR_PATTERN.match(expression, i)
+        if match:
+            tokens.append(("op", match.group(0), i))
+            i = match.end()
+            continue
+        word = re.match(r"[^<>=!()`]+", expression[i:] + " ").group(0).strip() or expression[i]
+        close = difflib.get_close_matches(word, columns, n=1)
+        hint = f"; bunu mu demek istediniz: {close[0]}" if close else ""
+        raise ValueError(f"Tanınmayan sütun ya da ifade: {word!r} (konum {i + 1}){hint}")
+    tokens.append(("end", None, len(expression)))
+    return tokens
+
+
+# Özyinelemeli iniş ayrıştırıcı; her düğüm (tür, değerlendirici) döner. Tür 'number', 'text' ya da 'bool'dur;
+# değerlendirici sütun dizisi veren get(sütun) fonksiyonunu alır. Tür hataları derleme sırasında yakalanır.
+class _Parser:
+    def __init__(self, expression, schema):
+        self.schema = dict(schema)
+        self.tokens = _tokenize(expression, list(self.schema))
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def take(self, kind=None, value=None):
+        token = self.tokens[self.pos]
+        if (kind and token[0] != kind) or (value and token[1] != value):
+            found = "ifade sonu" if token[0] == "end" else repr(token[1])
+            raise ValueError(f"Beklenmeyen {found} (konum {token[2] + 1})")
+        self.pos += 1
+        return token
+
+    def expect(self, node, kind, what):
+        if node[0] != kind:
+            raise ValueError(f"{what} {'koşul' if kind == 'bool' else 'sayı'} bekliyor")
+        return node[1]
+
+    def parse(self):
+        node = self.boolean("or")
+        self.take("end")
+        return node
+
+    def boolean(self, level):
+        if level == "not":
+            if self.peek()[:2] == ("keyword", "not"):
+                self.take()
+                inner = self.expect(self.boolean("not"), "bool", "not")
+                return "bool", lambda get: np.logical_not(inner(get))
+            return self.comparison()
+        node = self.boolean("and" if level == "or" else "not")
+        while self.peek()[:2] == ("keyword", level):
+            self.take()
+            left = self.expect(node, "bool", level)
+            right = self.expect(self.boolean("and" if level == "or" else "not"), "bool", level)
+            combine = np.logical_or if level == "or" else np.logical_and
+            node = "bool", lambda get, left=left, right=right, combine=combine: combine(left(get), right(get))
+        return node
+
+    def comparison(self):
+        left = self.arithmetic()
+        token = self.peek()
+        if token[0] != "op" or token[1] not in COMPARISONS:
+            return left
+        self.take()
+        right = self.arithmetic()
+        compare = COMPARISONS[token[1]]
+        if left[0] == right[0] == "text" and compare in (np.equal, np.not_equal):
+            pass
+        elif not left[0] == right[0] == "number":
+            raise ValueError(f"{token[1]} sayılar arasında kullanılır; metin sütunları sadece == ve != ile "
+                             f"karşılaştırılır (konum {token[2] + 1})")
+        left_eval, right_eval = left[1], right[1]
+        return "bool", lambda get: compare(left_eval(get), right_eval(get))
+
+    def arithmetic(self, operators=("+", "-")):
+        node = self.term() if operators == ("+", "-") else self.factor()
+        while self.peek()[0] == "op" and self.peek()[1] in operators:
+            operator = self.take()[1]
+            right = self.term() if operators == ("+", "-") else self.factor()
+            left_eval = self.expect(node, "number", operator)
+            right_eval = self.expect(right, "number", operator)
+            apply = ARITHMETIC[operator]
+            node = "number", lambda get, l=left_eval, r=right_eval, apply=apply: apply(l(get), r(get))
+        return node
+
+    def term(self):
+        return self.arithmetic(("*", "/"))
+
+    def factor(self):
+        kind, value, position = self.take()
+        if kind == "op" and value == "-":
+            inner = self.expect(self.factor(), "number", "-")
+            return "number", lambda get: -inner(get)
+        if kind == "number":
+            return "number", lambda get: value
+        if kind == "text":
+            return "text", lambda get: value
+        if kind == "column":
+            if value not in self.schema:
+                raise ValueError(f"Bilinmeyen sütun: {value!r} (konum {position + 1})")
+            return ("number" if self.schema[value] else "text"), lambda get: get(value)
+        if kind == "function":
+            arity, function = FUNCTIONS[value]
+            self.take("op", "(")
+            args = [self.expect(self.arithmetic(), "number", value)]
+            while len(args) < arity:
+                self.take("op", ",")
+                args.append(self.expect(self.arithmetic(), "number", value))
+            self.take("op", ")")
+            return "number", lambda get: function(*(arg(get) for arg in args))
+        if kind == "op" and value == "(":
+            node = self.boolean("or")
+            self.take("op", ")")
+            return node
+        found = "ifade sonu" if kind == "end" else repr(value)
+        raise ValueError(f"Beklenmeyen {found} (konum {position + 1})")
+
+
+# schema: ((sütun, sayısal mı), ...); aynı ifade ve tablo düzeni için derleme bir kez yapılır
+@lru_cache(maxsize=256)
+def compile_expression(expression, schema):
+    try:
+        return _Parser(expression, schema).parse()
+    except ValueError as e:
+        raise ValueError(f"{expression}: {e}") from None
+
+
+# === Kural Setleri ===
+# rules: hepsi sağlanması gereken koşullar; score: sıralama için sayısal ifade (boşsa tablo sırası korunur);
+# limit: en iyi kaç satır gösterileceği (0 = tümü)
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    rules: tuple = ()
+    score: str = ""
+    ascending: bool = False
+    limit: int = 0
+
+
+DEFAULT_RULE_SETS = {
+    "Dipte güçlü": RuleSet("Dipte güçlü", ("% Fark VAL < 10", "ATH'den % Fark > 80", "Market Cap > 50M"),
+                           score="ATH'den % Fark - % Fark VAL"),
+    "AVWAP altında": RuleSet("AVWAP altında", ("% Fark AVWAP < 0", "Market Cap > 10M"),
+                             score="% Fark AVWAP", ascending=True),
+}
+
+_screens_lock = threading.Lock()
+
+
+def load_rule_sets(path=SCREENS_PATH):
+    if not os.path.exists(path):
+        return dict(DEFAULT_RULE_SETS)
+    with open(path, encoding="utf-8") as f:
+        stored = json.load(f)
+    return {name: RuleSet(name, tuple(item.get("rules", ())), item.get("score", ""), item.get("ascending", False),
+                          item.get("limit", 0)) for name, item in stored.items()}
+
+
+def _write_rule_sets(rule_sets, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    payload = {name: {key: value for key, value in asdict(rule_set).items() if key != "name"}
+               for name, rule_set in rule_sets.items()}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def save_rule_set(rule_set, path=SCREENS_PATH):
+    with _screens_lock:
+        rule_sets = load_rule_sets(path)
+        rule_sets[rule_set.name] = rule_set
+        _write_rule_sets(rule_sets, path)
+
+
+def delete_rule_set(name, path=SCREENS_PATH):
+    with _screens_lock:
+        rule_sets = load_rule_sets(path)
+        rule_sets.pop(name, None)
+        _write_rule_sets(rule_sets, path)
+
+
+# === Tarayıcı ===
+# Tablo başına bir kez kurulur; sütunlar ilk kullanıldıklarında NumPy dizisine çevrilip saklanır.
+# Kurallar derlenmiş fonksiyonlarla tek bir maskeye indirgenir, sıralama argsort ile yapılır ve satırlar
+# sonda tek bir iloc ile seçilir; kural değiştiğinde yeniden tarama ya da ara DataFrame kopyası gerekmez.
+class Screener:
+    def __init__(self, df):
+        self.df = df
+        # Tümü boş sütun (örn. hazır çıktıda hiç gelmemiş piyasa verisi) metin değil sayısal sayılır
+        self.schema = tuple((col, pd.api.types.is_numeric_dtype(df[col]) or bool(df[col].isna().all()))
+                            for col in df.columns)
+        self._numeric = dict(self.schema)
+        self._arrays = {}
+
+    def column(self, col):
+        values = self._arrays.get(col)
+        if values is None:
+            series = self.df[col]
+            values = series.to_numpy(dtype=float, na_value=np.nan) if self._numeric[col] else \
+                series.to_numpy(dtype=object)
+            self._arrays[col] = values
+        return values
+
+    def _evaluate(self, expression, kind):
+        node_kind, evaluate = compile_expression(expression, self.schema)
+        if node_kind != kind:
+            raise ValueError(f"{expression}: {'koşul' if kind == 'bool' else 'sayısal ifade'} bekleniyor")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = evaluate(self.column)
+        return np.broadcast_to(np.asarray(result, dtype=bool if kind == "bool" else float), (len(self.df),))
+
+    def mask(self, rules):
+        mask = np.ones(len(self.df), dtype=bool)
+        for rule in rules:
+            mask &= self._evaluate(rule, "bool")
+        return mask
+
+    def score(self, expression):
+        return self._evaluate(expression, "number")
+
+    # Geçen satır konumları, skora göre sıralı (boş skorlar sonda)
+    def positions(self, rule_set):
+        rows = np.flatnonzero(self.mask(rule_set.rules))
+        scores = None
+        if rule_set.score:
+            scores = self.score(rule_set.score)[rows]
+            order = np.argsort(scores if rule_set.ascending else -scores, kind="stable")
+            rows, scores = rows[order], scores[order]
+        if rule_set.limit:
+            rows = rows[:rule_set.limit]
+            scores = None if scores is None else scores[:rule_set.limit]
+        return rows, scores
+
+    def apply(self, rule_set):
+        rows, scores = self.positions(rule_set)
+        result = self.df.iloc[rows]
+        if scores is not None and SCORE_COLUMN not in result.columns:
+            result = result.copy()
+            result.insert(0, SCORE_COLUMN, np.round(scores, 4))
+        return result
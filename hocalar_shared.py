@@ -0,0 +1,40 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from hocalar_candles import PRICE_COLUMNS, CandleSet
+
+# === Paylaşımlı Bellekte Mum Kümesi ===
+# CandleSet dizileri (hocalar_archive ile aynı alanlar) tek bir SharedMemory bloğuna art arda kopyalanır.
+# Alt süreçlere sadece küçük bir tanıtıcı (blok adı, semboller, alan yerleşimi) gönderilir; süreçler
+# bloğa bağlanıp dizileri kopyalamadan salt okunur görünüm olarak kullanır.
+SHARED_FIELDS = ('timestamp', 'offsets') + PRICE_COLUMNS
+
+
+# Bloğu oluşturan süreç işi bitince close() ve unlink() çağırmalıdır
+def share_candles(candles):
+    arrays = {field: np.ascontiguousarray(getattr(candles, field)) for field in SHARED_FIELDS}
+    shm = shared_memory.SharedMemory(create=True, size=max(sum(_aligned(a.nbytes) for a in arrays.values()), 1))
+    layout, offset = {}, 0
+    for field, array in arrays.items():
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=offset)[:] = array
+        layout[field] = (offset, len(array), array.dtype.str)
+        offset += _aligned(array.nbytes)
+    return shm, (shm.name, list(candles.symbols), layout)
+
+
+# Her alan 8 bayt hizalı başlar (float32 sütunlardan sonra gelen int64 dizileri için)
+def _aligned(nbytes):
+    return -(-nbytes // 8) * 8
+
+
+# Dönen SharedMemory nesnesi diziler kullanıldığı sürece açık tutulmalıdır
+def attach_candles(handle):
+    name, symbols, layout = handle
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {}
+    for field, (offset, length, dtype) in layout.items():
+        array = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[field] = array
+    return shm, CandleSet(symbols, **arrays)
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from hocalar_metrics import InstrumentedSession, cache_event
+
+# === Ayarlar ===
+SHEET_TTL = int(os.environ.get("HOCALAR_SHEET_TTL", "120"))
+REQUEST_TIMEOUT = 20
+# Google Sheets hata hücreleri ve boş değerler NaN sayılır
+NA_VALUES = {"", "-", "N/A", "#N/A", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#ERROR!"}
+THOUSANDS_PATTERN = re.compile(r"^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$")
+
+
+# === Google Sheets Düzenleme Adresini CSV Dışa Aktarma Adresine Çevir ===
+def convert_edit_url_to_csv(url):
+    base = url.split("/edit")[0]
+    if "gid=" in url:
+        # mevcut gid parametresini koru
+        gid = url.split("gid=")[-1].split("&")[0]
+        return f"{base}/export?format=csv&gid={gid}"
+    return f"{base}/export?format=csv"
+
+
+# === Tip Çıkarımı ===
+# Tüm hücreler metin olarak okunur, sonra her sütun açıkça çevrilir: boş olmayan tüm değerler sayıya
+# dönüşüyorsa (1,234.5 binlik ayırıcı, %12, 12% ve $3 biçimleri dahil) sütun sayısaldır, değilse metin kalır.
+# pandas'ın parça parça tahmininden farklı olarak sonuç veri sırasından bağımsızdır.
+def infer_column(values):
+    text = values.str.strip()
+    text = text.mask(text.isin(NA_VALUES))
+    present = text.notna()
+    if not present.any():
+        return pd.Series(np.nan, index=values.index)
+    # Baştaki $ ya da % (işaretten sonra da olabilir, -$3) ve sondaki % atılır; binlik ayırıcı ondan sonra bakılır
+    cleaned = text.str.replace(r"^([-+]?)\s*[\$%]\s*", r"\1", regex=True).str.replace(r"\s*%$", "", regex=True)
+    thousands = cleaned.str.match(THOUSANDS_PATTERN).fillna(False).astype(bool)
+    cleaned = cleaned.where(~thousands, cleaned.str.replace(",", "", regex=False))
+    numbers = pd.to_numeric(cleaned, errors="coerce")
+    if numbers[present].notna().all():
+        return numbers
+    return text
+
+
+def parse_sheet(content):
+    df = pd.read_csv(BytesIO(content), dtype=str, keep_default_na=False)
+    df.columns = df.columns.str.strip()
+    return pd.DataFrame({col: infer_column(df[col]) for col in df.columns}, index=df.index)
+
+
+# === Sayfa Verisi ===
+# digest ham CSV baytlarının özetidir; değişmediyse frame aynı nesne kalır ve birleştirme atlanabilir.
+@dataclass(frozen=True)
+class SheetData:
+    frame: pd.DataFrame
+    digest: str
+    fetched_at: float
+    changed_at: float
+    error: str = None
+
+
+# === Sayfa Yükleyici ===
+# Süreç genelinde sayfa başına son içerik tutulur. TTL dolmuşsa eski veri hemen döner ve arka planda
+# tek bir yenileme başlatılır; böylece filtre etkileşimleri ağı hiç beklemez. İlk yükleme ve refresh()
+# (elle yenileme) senkrondur. İçerik özeti aynıysa CSV yeniden ayrıştırılmaz.
+class SheetLoader:
+    def __init__(self, ttl=SHEET_TTL, session=None):
+        self.ttl = ttl
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=2))
+        self.session = InstrumentedSession(session, "sheets")
+        self._sheets = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _download(self, url):
+        response = self.session.get(convert_edit_url_to_csv(url), timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
+    # Hata olursa eldeki veri korunur ve hatası kaydedilir; hiç veri yoksa hata yükseltilir
+    def refresh(self, url):
+        now = time.time()
+        try:
+            content = self._download(url)
+        except Exception as e:
+            with self._lock:
+                current = self._sheets.get(url)
+                if current is None:
+                    raise
+                self._sheets[url] = replace(current, fetched_at=now, error=str(e))
+                return self._sheets[url]
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        with self._lock:
+            current = self._sheets.get(url)
+        if current is not None and current.digest == digest:
+            sheet = replace(current, fetched_at=now, error=None)
+        else:
+            sheet = SheetData(parse_sheet(content), digest, now, now)
+        with self._lock:
+            self._sheets[url] = sheet
+        return sheet
+
+    def get(self, url):
+        with self._lock:
+            sheet = self._sheets.get(url)
+        if sheet is None:
+            cache_event("sheet", False)
+            return self.refresh(url)
+        fresh = time.time() - sheet.fetched_at <= self.ttl
+        cache_event("sheet", fresh)
+        if not fresh:
+            self._refresh_in_background(url)
+        return sheet
+
+    def _refresh_in_background(self, url):
+        with self._lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+
+        def run():
+            try:
+                self.refresh(url)
+            except Exception as e:
+                print(f"{url} yenilenemedi: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(url)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def get_sheet_loader():
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = SheetLoader()
+        return _loader
+
+
+# Testlerde ya da kayıt/oynatma için hazır bir yükleyici kullanılabilir
+def set_sheet_loader(loader):
+    global _loader
+    with _loader_lock:
+        _loader = loader
@@ -0,0 +1,180 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from hocalar_indicators import _anchor_ms, _bin_volume, _profile_grid, _timestamps_ms, _typical_price
+from hocalar_metrics import timed
+
+# === Artımlı Gösterge Durumu ===
+# Kapanmış mumların toplamları saklanır; her çağrıda sadece yeni kapanan mumlar eklenir.
+# Son mum henüz kapanmamış olabileceği için duruma yazılmaz, sonuca anlık olarak katılır.
+# Durum, kaydedildiği andaki kapanmış mum sayısını da tutar; boşluk onarımı (sync_store) son mumdan önceye
+# mum eklerse sayı tutmaz ve durum baştan kurulur, aksi halde eklenen mumlar toplamlara hiç girmezdi.
+STATE_VERSION = 2
+
+
+# === AVWAP Toplamları ===
+# Σ(tp·v), Σv ve tp için Welford (n, ortalama, M2). Eski std, tp'nin AVWAP etrafındaki (ağırlıksız)
+# sapmasıdır: mean((tp - avwap)²) = M2/n + (ortalama - avwap)².
+class AvwapState:
+    def __init__(self, start_ts, last_ts=None, sum_pv=0.0, sum_v=0.0, rows=0, n=0, mean=0.0, m2=0.0):
+        self.start_ts = start_ts
+        self.last_ts = last_ts
+        self.sum_pv = sum_pv
+        self.sum_v = sum_v
+        self.rows = rows
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    # Eski calculate_avwap ile aynı başlangıç kuralı: çapa veriden önceyse ikinci mumdan başlanır
+    @classmethod
+    def start_for(cls, ts, anchor_date):
+        anchor_ts = _anchor_ms(anchor_date)
+        return anchor_ts if ts[0] <= anchor_ts else int(ts[1])
+
+    def copy(self):
+        return AvwapState(**self.__dict__)
+
+    def add(self, tp, volume):
+        self.sum_pv += np.nansum(tp * volume)
+        self.sum_v += np.nansum(volume)
+        self.rows += len(tp)
+        tp = tp[~np.isnan(tp)]
+        if len(tp):
+            n_b, mean_b = len(tp), tp.mean()
+            m2_b = ((tp - mean_b) ** 2).sum()
+            n = self.n + n_b
+            delta = mean_b - self.mean
+            self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+            self.mean += delta * n_b / n
+            self.n = n
+
+    def value(self):
+        if self.rows == 0 or self.sum_v == 0:
+            return None, None
+        avwap = self.sum_pv / self.sum_v
+        std = np.sqrt(self.m2 / self.n + (self.mean - avwap) ** 2) if self.rows > 1 and self.n else 0
+        return avwap, avwap + 4 * std
+
+
+# === ATH Sonrası Volume Profile Kutuları ===
+# Izgara (adım ve kenarlar) ATH fiyatına ve pencere dibine bağlıdır; yeni ATH ya da yeni dip gelince
+# pencere baştan kurulur, aksi halde yeni mumların hacmi mevcut kutulara eklenir.
+class ProfileState:
+    def __init__(self, ath_ts, ath_price, low, tick_size, row_param, bins, last_ts):
+        self.ath_ts = ath_ts
+        self.ath_price = ath_price
+        self.low = low
+        self.tick_size = tick_size
+        self.row_param = row_param
+        self.bins = np.asarray(bins, dtype=float)
+        self.last_ts = last_ts
+        self.price_step, self.bin_edges = _profile_grid(ath_price, low, tick_size, row_param)
+
+    @classmethod
+    def build(cls, df, ts, tick_size, row_param, last_ts):
+        high = df['high'].to_numpy(dtype=float)
+        ath_idx = int(np.nanargmax(high))
+        window = df.iloc[ath_idx:]
+        state = cls(int(ts[ath_idx]), float(high[ath_idx]), float(window['low'].min()), tick_size, row_param,
+                    [], last_ts)
+        state.bins = np.zeros(max(len(state.bin_edges) - 1, 0))
+        state.add(window)
+        return state
+
+    def copy(self):
+        return ProfileState(self.ath_ts, self.ath_price, self.low, self.tick_size, self.row_param,
+                            self.bins.copy(), self.last_ts)
+
+    def accepts(self, rows):
+        return not (rows['high'].max() > self.ath_price or rows['low'].min() < self.low)
+
+    def add(self, rows):
+        n_bins = len(self.bins)
+        close, volume = rows['close'].to_numpy(dtype=float), rows['volume'].to_numpy(dtype=float)
+        self.bins += _bin_volume(close, None, None, volume, self.bin_edges[0], self.price_step, n_bins, 0, n_bins)
+
+    def frame(self):
+        return pd.DataFrame({'price_level': (self.bin_edges[:-1] + self.bin_edges[1:]) / 2,
+                             'total_volume': self.bins})
+
+
+# === Durumu Güncelle ===
+# df: sembolün tüm geçmişi (yerel depodan). Sadece state.last_ts sonrasındaki satırlar işlenir;
+# çapa değişirse, geçmiş baştan değişirse, kaydedilen son muma kadar mum eklenmiş ya da silinmişse ya da
+# yeni ATH/dip oluşursa ilgili kısım yeniden kurulur.
+@timed("update_indicator_state")
+def update_indicator_state(df, state, anchor_date="2020-03-18", tick_size=0.01, row_param=50):
+    ts = _timestamps_ms(df)
+    closed_ts = int(ts[-2]) if len(ts) > 1 else None
+    avwap_state = profile_state = None
+    if state and state.get('version') == STATE_VERSION and state.get('first_ts') == int(ts[0]) \
+            and state.get('anchor_date') == anchor_date \
+            and int(np.searchsorted(ts, state['closed_ts'], 'right')) == state['closed_rows']:
+        avwap_state = AvwapState(**state['avwap'])
+        profile = state['profile']
+        if profile and profile['tick_size'] == tick_size and profile['row_param'] == row_param:
+            profile_state = ProfileState(**profile)
+
+    start = AvwapState.start_for(ts, anchor_date)
+    if avwap_state is None or avwap_state.start_ts != start:
+        avwap_state = AvwapState(start)
+    avwap_from = max(start, avwap_state.last_ts + 1) if avwap_state.last_ts is not None else start
+    closed = slice(np.searchsorted(ts, avwap_from), len(ts) - 1)
+    tp = _typical_price(df.iloc[closed])
+    avwap_state.add(tp, df['volume'].to_numpy(dtype=float)[closed])
+    avwap_state.last_ts = closed_ts
+
+    if profile_state is not None:
+        new_rows = df.iloc[np.searchsorted(ts, profile_state.last_ts + 1):len(ts) - 1]
+        if profile_state.accepts(new_rows):
+            profile_state.add(new_rows)
+            profile_state.last_ts = closed_ts
+        else:
+            profile_state = None
+    if profile_state is None and len(ts) > 1:
+        profile_state = ProfileState.build(df.iloc[:-1], ts, tick_size, row_param, closed_ts)
+
+    # Kapanmamış son mum sonuca anlık eklenir
+    last = df.iloc[-1:]
+    current_avwap = avwap_state.copy()
+    if ts[-1] >= start:
+        current_avwap.add(_typical_price(last), last['volume'].to_numpy(dtype=float))
+    if profile_state is not None and profile_state.accepts(last):
+        current_profile = profile_state.copy()
+        current_profile.add(last)
+    else:
+        current_profile = ProfileState.build(df, ts, tick_size, row_param, int(ts[-1]))
+
+    avwap, avwap_upper = current_avwap.value()
+    indicators = {
+        'ath_price': current_profile.ath_price,
+        'ath_date': pd.Timestamp(current_profile.ath_ts, unit='ms'),
+        'avwap': avwap,
+        'avwap_upper': avwap_upper,
+        'vp': current_profile.frame(),
+    }
+    new_state = {
+        'version': STATE_VERSION,
+        'first_ts': int(ts[0]),
+        'anchor_date': anchor_date,
+        'closed_ts': closed_ts if closed_ts is not None else int(ts[0]) - 1,
+        'closed_rows': len(ts) - 1,
+        'avwap': avwap_state.__dict__,
+        'profile': None if profile_state is None else {
+            'ath_ts': profile_state.ath_ts, 'ath_price': profile_state.ath_price, 'low': profile_state.low,
+            'tick_size': tick_size, 'row_param': row_param, 'bins': profile_state.bins.tolist(),
+            'last_ts': profile_state.last_ts,
+        },
+    }
+    return indicators, new_state
+
+
+def dumps_state(state):
+    return json.dumps(state, default=float)
+
+
+def loads_state(payload):
+    return json.loads(payload) if payload else None
@@ -0,0 +1,233 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from hocalar_metrics import stage
+
+# === Ayarlar ===
+DEFAULT_STORE_PATH = os.environ.get("HOCALAR_STORE_PATH", os.path.join(".hocalar_cache", "candles.sqlite"))
+DEFAULT_SINCE = "2019-01-01T00:00:00Z"
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+CHUNK_ROWS = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (exchange, symbol, timeframe, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS known_gaps (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    gap_start INTEGER NOT NULL,
+    gap_end INTEGER NOT NULL,
+    PRIMARY KEY (exchange, symbol, timeframe, gap_start)
+);
+CREATE TABLE IF NOT EXISTS indicator_state (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    state_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (exchange, symbol, timeframe, state_key)
+);
+"""
+
+
+# === Yerel Mum Deposu (SQLite) ===
+class CandleStore:
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def last_timestamp(self, exchange_id, symbol, timeframe):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE exchange=? AND symbol=? AND timeframe=?",
+                (exchange_id, symbol, timeframe)).fetchone()
+        return row[0]
+
+    def load(self, exchange_id, symbol, timeframe, since=None):
+        query = "SELECT ts, open, high, low, close, volume FROM candles WHERE exchange=? AND symbol=? AND timeframe=?"
+        params = [exchange_id, symbol, timeframe]
+        if since is not None:
+            query += " AND ts >= ?"
+            params.append(int(since))
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY ts", params).fetchall()
+        return rows
+
+    # Mumları (ts, open, high, low, close, volume) float dizileri halinde parça parça döndürür; bellek
+    # kullanımı chunk_rows ile sınırlıdır. Kilit parçalar arasında bırakılır (ts üzerinden sayfalama).
+    def iter_chunks(self, exchange_id, symbol, timeframe, since=None, chunk_rows=CHUNK_ROWS):
+        last = -1 if since is None else int(since) - 1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT ts, open, high, low, close, volume FROM candles"
+                    " WHERE exchange=? AND symbol=? AND timeframe=? AND ts > ? ORDER BY ts LIMIT ?",
+                    (exchange_id, symbol, timeframe, last, chunk_rows)).fetchall()
+            if not rows:
+                return
+            chunk = np.array(rows, dtype=float)
+            yield chunk
+            if len(rows) < chunk_rows:
+                return
+            last = int(chunk[-1, 0])
+
+    def upsert(self, exchange_id, symbol, timeframe, ohlcv):
+        if not ohlcv:
+            return 0
+        rows = [(exchange_id, symbol, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in ohlcv]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # Ardışık iki mum arasındaki fark bir periyottan büyükse boşluk vardır.
+    # Borsada gerçekten veri olmayan aralıklar known_gaps tablosuna yazılır ve tekrar istenmez.
+    def find_gaps(self, exchange_id, symbol, timeframe, step_ms):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT prev_ts + ?, ts - ? FROM ("
+                "  SELECT ts, LAG(ts) OVER (ORDER BY ts) AS prev_ts FROM candles"
+                "  WHERE exchange=? AND symbol=? AND timeframe=?"
+                ") WHERE prev_ts IS NOT NULL AND ts - prev_ts > ?",
+                (step_ms, step_ms, exchange_id, symbol, timeframe, step_ms)).fetchall()
+            known = {r[0] for r in self._conn.execute(
+                "SELECT gap_start FROM known_gaps WHERE exchange=? AND symbol=? AND timeframe=?",
+                (exchange_id, symbol, timeframe))}
+        return [(start, end) for start, end in rows if start not in known]
+
+    def mark_known_gap(self, exchange_id, symbol, timeframe, gap_start, gap_end):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO known_gaps VALUES (?, ?, ?, ?, ?)",
+                               (exchange_id, symbol, timeframe, int(gap_start), int(gap_end)))
+
+    # Artımlı gösterge durumu (hocalar_state) JSON olarak saklanır
+    def load_state(self, exchange_id, symbol, timeframe, state_key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM indicator_state WHERE exchange=? AND symbol=? AND timeframe=? AND state_key=?",
+                (exchange_id, symbol, timeframe, state_key)).fetchone()
+        return row[0] if row else None
+
+    def save_state(self, exchange_id, symbol, timeframe, state_key, payload):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO indicator_state VALUES (?, ?, ?, ?, ?)",
+                               (exchange_id, symbol, timeframe, state_key, payload))
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+_default_path = DEFAULT_STORE_PATH
+
+
+# Varsayılan depo başka bir dosyaya yönlendirilebilir (ör. oynatma çalışmaları gerçek depoya yazmasın).
+# Ortam değişkeni de güncellenir; sonradan başlatılan alt süreçler aynı depoyu kullanır.
+def set_default_store(path):
+    global _default_path
+    _default_path = path
+    os.environ["HOCALAR_STORE_PATH"] = path
+
+
+def get_store(path=None):
+    path = path or _default_path
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CandleStore(path)
+        return _stores[path]
+
+
+# === OHLCV Listesini DataFrame'e Çevir ===
+def ohlcv_to_frame(ohlcv):
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+# === Borsadan Sayfalı OHLCV Al ===
+# (mumlar, tamam) döner; bir sayfa hata verirse (zaman aşımı, 429) o ana kadar gelenler ve tamam=False döner.
+# Tamamlanmamış aralığın kalanı borsanın boş döndüğü anlamına gelmez.
+def fetch_ohlcv_range(exchange, symbol, timeframe, since, until=None, limit=1000, pause=0):
+    step_ms = exchange.parse_timeframe(timeframe) * 1000
+    until = exchange.milliseconds() if until is None else until
+    ohlcv = []
+    complete = True
+    while since < until:
+        try:
+            data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+            if not data:
+                break
+            ohlcv.extend(c for c in data if c[0] <= until)
+            if data[-1][0] >= until:
+                break
+            since = data[-1][0] + step_ms
+            if pause:
+                with stage("sleep"):
+                    time.sleep(pause)
+        except Exception as e:
+            print(f"{symbol} verisi alinirken hata: {e}")
+            complete = False
+            break
+    return ohlcv, complete
+
+
+# [gap_start, gap_end] içinde mum gelmeyen alt aralıklar; başlangıçlar find_gaps'in verdiği gibidir
+def missing_ranges(ohlcv, gap_start, gap_end, step_ms):
+    ts = sorted(int(c[0]) for c in ohlcv if gap_start <= c[0] <= gap_end)
+    bounds = [gap_start - step_ms] + ts + [gap_end + step_ms]
+    return [(prev + step_ms, next_ts - step_ms) for prev, next_ts in zip(bounds, bounds[1:])
+            if next_ts - prev > step_ms]
+
+
+# === Depoyu Güncelle ===
+# Sadece son kayıtlı mumdan itibaren çekilir; son mum henüz kapanmamış olabileceği için yeniden yazılır.
+# since: ISO tarih ya da epoch-ms; sadece depo boşken ilk indirmenin başlangıcıdır.
+def sync_store(exchange, symbol, timeframe='1d', since=DEFAULT_SINCE, store=None, pause=0):
+    store = store or get_store()
+    exchange_id = exchange.id
+    step_ms = exchange.parse_timeframe(timeframe) * 1000
+    last_ts = store.last_timestamp(exchange_id, symbol, timeframe)
+    if last_ts is not None:
+        start = last_ts
+    else:
+        start = int(since) if isinstance(since, (int, np.integer)) else exchange.parse8601(since)
+    store.upsert(exchange_id, symbol, timeframe,
+                 fetch_ohlcv_range(exchange, symbol, timeframe, start, pause=pause)[0])
+    if last_ts is not None:
+        for gap_start, gap_end in store.find_gaps(exchange_id, symbol, timeframe, step_ms):
+            filled, complete = fetch_ohlcv_range(exchange, symbol, timeframe, gap_start, until=gap_end, pause=pause)
+            store.upsert(exchange_id, symbol, timeframe, filled)
+            # Borsanın verdiği mumlardan sonra boşlukta kalan aralıklar (ör. bakım saatleri) gerçek boşluktur.
+            # İndirme yarıda kesildiyse sadece son gelen muma kadarki sayfalar yanıtlanmıştır; kalanı boş
+            # sayılmaz, sonraki senkronizasyonda yeniden denenir.
+            answered_until = gap_end if complete else max((c[0] for c in filled), default=gap_start - 1)
+            for missing_start, missing_end in missing_ranges(filled, gap_start, gap_end, step_ms):
+                if missing_end <= answered_until:
+                    store.mark_known_gap(exchange_id, symbol, timeframe, missing_start, missing_end)
+
+
+# === Depoyu Güncelle ve Mumları Döndür ===
+# load_since verilirse depodan sadece o andan sonraki mumlar döner (geçmiş arşivden geliyorsa).
+def sync_ohlcv(exchange, symbol, timeframe='1d', since=DEFAULT_SINCE, store=None, offline=False, pause=0,
+               load_since=None):
+    store = store or get_store()
+    if not offline:
+        sync_store(exchange, symbol, timeframe, since, store, pause)
+    return ohlcv_to_frame(store.load(exchange.id, symbol, timeframe, since=load_since))
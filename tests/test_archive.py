@@ -0,0 +1,28 @@
+import numpy as np
+
+from hocalar_archive import archived_candles, build_archive
+from hocalar_store import CandleStore
+
+DAY = 86_400_000
+
+
+def _rows(days, price):
+    return [[i * DAY, price, price + 1, price - 1, price, 10.0] for i in range(days)]
+
+
+def test_partial_build_keeps_other_symbols(tmp_path):
+    store = CandleStore(str(tmp_path / "candles.sqlite"))
+    root = str(tmp_path / "archive")
+    store.upsert("test", "AAA/USDT", "1d", _rows(5, 1.0))
+    store.upsert("test", "BBB/USDT", "1d", _rows(3, 2.0))
+    build_archive(store, "test", ["AAA/USDT", "BBB/USDT"], root=root)
+
+    store.upsert("test", "AAA/USDT", "1d", _rows(8, 3.0))
+    merged = build_archive(store, "test", ["AAA/USDT"], root=root, merge=True)
+
+    assert sorted(merged.symbols) == ["AAA/USDT", "BBB/USDT"]
+    assert np.array_equal(archived_candles("test", "AAA/USDT", root=root).close, np.full(8, 3.0))
+    assert np.array_equal(archived_candles("test", "BBB/USDT", root=root).close, np.full(3, 2.0))
+
+    build_archive(store, "test", ["AAA/USDT"], root=root)
+    assert archived_candles("test", "BBB/USDT", root=root) is None
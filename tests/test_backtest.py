@@ -0,0 +1,14 @@
+import pytest
+
+from hocalar_backtest import parse_args
+
+
+@pytest.mark.parametrize("argv", [["--horizons", "0"], ["--horizons", "7,-1"], ["--horizons", "x"], ["--horizons", ","],
+                                  ["--limit", "5"]])
+def test_parse_args_rejects_unusable_options(argv):
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+
+
+def test_parse_args_horizons():
+    assert parse_args(["--horizons", "1, 5", "--limit", "3", "--score", "close"]).horizons == (1, 5)
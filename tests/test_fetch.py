@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from hocalar_fetch import MARKETS_WEIGHT, WEIGHT_HEADER, RateLimitedExchange, kline_weight
+
+
+@pytest.mark.parametrize("limit, weight", [(None, 5), (50, 1), (99, 1), (100, 2), (500, 5), (1000, 5), (1500, 10)])
+def test_kline_weight_follows_limit(limit, weight):
+    assert kline_weight(limit) == weight
+
+
+# Her isteğin yanıt başlığı kendi ağırlığını taşır; iki iş parçacığı istekleri iç içe geçirir
+class FakeExchange:
+    rateLimit = 1
+
+    def __init__(self):
+        self.enableRateLimit = True
+        self.last_response_headers = {}
+        self.last_http_response = None
+        self.started = threading.Barrier(2)
+
+    def on_rest_response(self, code, reason, url, method, headers, body, request_headers, request_body):
+        return body
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        self.started.wait()
+        headers = {WEIGHT_HEADER: str(limit)}
+        self.last_response_headers = headers
+        self.last_http_response = self.on_rest_response(200, "OK", "klines", "GET", headers, "x" * limit, {}, None)
+        self.started.wait()
+        return [[limit]]
+
+    def load_markets(self):
+        return {}
+
+
+def test_owned_client_reads_its_own_response():
+    exchange = FakeExchange()
+    client = RateLimitedExchange(exchange, weight_limit=10 ** 6, owned=True)
+    assert exchange.enableRateLimit is False
+    seen = {}
+
+    def worker(limit):
+        client.fetch_ohlcv("BTC/USDT", limit=limit)
+        seen[limit] = (client._response.headers[WEIGHT_HEADER], client._response.size)
+
+    threads = [threading.Thread(target=worker, args=(limit,)) for limit in (10, 20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen == {10: ("10", 10), 20: ("20", 20)}
+
+
+def test_shared_client_keeps_its_throttle_and_charges_call_weight():
+    exchange = FakeExchange()
+    exchange.started = threading.Barrier(1)
+    client = RateLimitedExchange(exchange, owned=False)
+    charged = []
+    client.bucket.acquire = charged.append
+    client.fetch_ohlcv("BTC/USDT", limit=1000)
+    client.load_markets()
+    assert exchange.enableRateLimit is True
+    assert charged == [5, MARKETS_WEIGHT]
+    assert client._response.headers == {WEIGHT_HEADER: "1000"}
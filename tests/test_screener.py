@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hocalar_enrich import empty_market_data
+from hocalar_scan import METRIC_COLUMNS, build_result_frame
+from hocalar_screener import DEFAULT_RULE_SETS, SCORE_COLUMN, RuleSet, Screener, compile_expression
+
+
+def _frame():
+    return pd.DataFrame({
+        "Symbol": ["AAA/USDT", "BBB/USDT", "CCC/USDT", "DDD/USDT"],
+        "ATH'den % Fark": [90.0, 85.0, 40.0, np.nan],
+        "% Fark VAL": [5.0, 12.0, 3.0, 1.0],
+        "Market Cap": [80e6, 60e6, 20e6, 1e9],
+    })
+
+
+def _scan_rows(n):
+    return [[f"SYM{i}/USDT", f"SYM{i}", f"Sym {i}"] + [float(i + 1)] * len(METRIC_COLUMNS) for i in range(n)]
+
+
+# === Ayrıştırıcı ===
+def test_column_names_with_spaces_and_suffixes():
+    screener = Screener(_frame())
+    mask = screener.mask(["% Fark VAL < 10 and ATH'den % Fark > 80", "Market Cap > 50M"])
+    assert mask.tolist() == [True, False, False, False]
+
+
+def test_keywords_parentheses_and_functions():
+    screener = Screener(_frame())
+    assert screener.mask(["değil (`% Fark VAL` >= 10) veya Market Cap < 0.05B"]).tolist() == [True, False, True, True]
+    assert screener.score("max(% Fark VAL, 4) * 2").tolist() == [10.0, 24.0, 8.0, 8.0]
+
+
+def test_text_columns_compare_with_quoted_values():
+    screener = Screener(_frame())
+    assert screener.mask(["Symbol == 'CCC/USDT'"]).tolist() == [False, False, True, False]
+    with pytest.raises(ValueError):
+        screener.mask(["Symbol > 3"])
+
+
+@pytest.mark.parametrize("expression", ["Market Cap >", "Olmayan Sütun > 1", "(% Fark VAL < 10", "`Market Cap > 1"])
+def test_invalid_expressions_raise_value_error(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression, Screener(_frame()).schema)
+
+
+def test_rule_and_score_kinds_are_checked():
+    screener = Screener(_frame())
+    with pytest.raises(ValueError):
+        screener.mask(["Market Cap"])
+    with pytest.raises(ValueError):
+        screener.score("Market Cap > 1")
+
+
+# === Değerlendirme ===
+def test_missing_values_fail_comparisons():
+    screener = Screener(_frame())
+    assert not screener.mask(["ATH'den % Fark > 0"])[3]
+
+
+def test_apply_sorts_by_score_and_limits():
+    result = Screener(_frame()).apply(RuleSet("test", ("Market Cap > 10M",), score="% Fark VAL", ascending=True,
+                                              limit=2))
+    assert result["Symbol"].tolist() == ["DDD/USDT", "CCC/USDT"]
+    assert result[SCORE_COLUMN].tolist() == [1.0, 3.0]
+
+
+# Piyasa verisi hiç gelmediğinde (tümü None) sütunlar yine sayısal olmalı; varsayılan kural setleri hata vermemeli
+def test_default_rule_sets_with_empty_market_data():
+    rows = _scan_rows(3)
+    df = build_result_frame(rows, [empty_market_data() for _ in rows])
+    assert pd.api.types.is_float_dtype(df["Market Cap"])
+    screener = Screener(df)
+    for rule_set in DEFAULT_RULE_SETS.values():
+        assert screener.apply(rule_set).empty
+
+
+def test_all_missing_object_column_is_numeric():
+    df = _frame().assign(TVL=pd.Series([None] * 4, dtype=object))
+    screener = Screener(df)
+    assert screener.mask(["TVL > 1M"]).tolist() == [False] * 4
+    assert screener.mask(["TVL > 1M or Market Cap > 50M"]).tolist() == [True, True, False, True]
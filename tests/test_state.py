@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from hocalar_benchmark import make_synthetic_ohlcv
+from hocalar_state import dumps_state, loads_state, update_indicator_state
+
+
+def _assert_same(indicators, expected):
+    assert indicators['avwap'] == pytest.approx(expected['avwap'], rel=1e-9)
+    assert indicators['avwap_upper'] == pytest.approx(expected['avwap_upper'], rel=1e-9)
+    assert indicators['ath_date'] == expected['ath_date']
+    np.testing.assert_allclose(indicators['vp']['total_volume'], expected['vp']['total_volume'], rtol=1e-9)
+
+
+def test_appended_candles_match_full_recompute():
+    df = make_synthetic_ohlcv(800, seed=1, start="2020-01-01")
+    _, state = update_indicator_state(df.iloc[:700], None)
+    indicators, _ = update_indicator_state(df, loads_state(dumps_state(state)))
+    _assert_same(indicators, update_indicator_state(df, None)[0])
+
+
+# Boşluk onarımı son kaydedilen mumdan önceye mum ekler; durum bunu fark edip baştan kurulmalı
+@pytest.mark.parametrize("missing", [200, 400, 697])
+def test_candle_inserted_behind_saved_state(missing):
+    df = make_synthetic_ohlcv(800, seed=2, start="2020-01-01")
+    df.loc[missing, 'volume'] *= 50
+    _, state = update_indicator_state(df.iloc[:700].drop(index=missing), None)
+    indicators, _ = update_indicator_state(df, loads_state(dumps_state(state)))
+    _assert_same(indicators, update_indicator_state(df, None)[0])